@@ -0,0 +1,217 @@
+import argparse
+import json
+import os
+from collections import Counter
+from itertools import repeat
+from multiprocessing import Pool
+
+from passgen import CHARACTER_CLASSES
+from strength import BloomFilter, charset_entropy
+
+CHUNK_SIZE = 64 * 1024 * 1024  # bytes of input per worker task
+READ_SIZE = 1024 * 1024
+CLASS_MARKS = {'upper': b'U', 'lower': b'L', 'digits': b'D', 'symbols': b'S'}
+# anything outside the policy's classes, including non-ASCII bytes
+OTHER_MARK = b'X'
+
+class AuditPolicy:
+    # plain settings only, so the policy can be handed to worker processes
+    def __init__(self, min_length=12, required=('upper', 'lower', 'digits', 'symbols'),
+                 min_bits=None, bloom_file=None, field=None, delimiter=None):
+        for name in required:
+            if name not in CLASS_MARKS:
+                raise ValueError(f"Unknown character class: {name}")
+        self.min_length = min_length
+        self.required = tuple(required)
+        self.min_bits = min_bits
+        self.bloom_file = bloom_file
+        self.field = field
+        self.delimiter = delimiter.encode('utf-8') if isinstance(delimiter, str) else delimiter
+        marks = bytearray(OTHER_MARK * 256)
+        for name, chars in CHARACTER_CLASSES:
+            for char in chars.encode('ascii'):
+                marks[char] = CLASS_MARKS[name][0]
+        # line breaks map to themselves so a whole translated block still splits into lines
+        marks[ord('\n')], marks[ord('\r')] = ord('\n'), ord('\r')
+        self.table = bytes(marks)
+
+class RangeAuditor:
+    # entries are tallied by shape (length, classes used, breached, weak) rather
+    # than judged one at a time; the tally stays small however large the input,
+    # and only the extra checks need a Python step per password
+    def __init__(self, policy):
+        self.policy = policy
+        self.bloom = BloomFilter(policy.bloom_file) if policy.bloom_file else None
+        self.shapes = Counter()
+        self.malformed = 0
+        self.empty = 0
+
+    def _passwords(self, lines):
+        position, delimiter = self.policy.field, self.policy.delimiter
+        for line in lines:
+            fields = line.split(delimiter)
+            if len(fields) < position:
+                self.malformed += 1
+            elif not fields[position - 1]:
+                # counted apart, as an empty field re-joined into the block
+                # would look like a blank line and be dropped
+                self.empty += 1
+            else:
+                yield fields[position - 1]
+
+    def _shape(self, password):
+        text = password.decode('utf-8', 'replace')
+        breached = self.bloom is not None and text in self.bloom
+        weak = self.policy.min_bits is not None and charset_entropy(text) < self.policy.min_bits
+        return len(password), frozenset(password.translate(self.policy.table)), breached, weak
+
+    def add(self, block):
+        # block is a run of whole lines; blank lines tally as length 0 and are
+        # dropped when the report is made
+        if self.policy.field is not None:
+            block = b'\n'.join(self._passwords(line for line in block.splitlines() if line))
+        if self.bloom is None and self.policy.min_bits is None:
+            # translating the whole block keeps the per-line work inside C calls
+            marks = block.translate(self.policy.table).splitlines()
+            self.shapes.update(zip(map(len, marks), map(frozenset, marks), repeat(False), repeat(False)))
+        else:
+            self.shapes.update(self._shape(password) for password in block.splitlines())
+
+    def close(self):
+        if self.bloom is not None:
+            self.bloom.close()
+
+def _audit_range(job):
+    # a range owns every line that starts inside it, so a line cut by the
+    # boundary is finished by this worker and skipped by the next one
+    filename, start, end, policy = job
+    auditor = RangeAuditor(policy)
+    try:
+        with open(filename, 'rb') as f:
+            if start:
+                f.seek(start - 1)
+                f.readline()
+            pos = f.tell()
+            while pos < end:
+                block = f.read(min(READ_SIZE, end - pos))
+                if not block:
+                    break
+                if not block.endswith(b'\n'):
+                    block += f.readline()
+                pos = f.tell()
+                auditor.add(block)
+    finally:
+        auditor.close()
+    return auditor.shapes, auditor.malformed, auditor.empty
+
+def _ranges(filename, policy, chunk_size):
+    size = os.path.getsize(filename)
+    for start in range(0, size, chunk_size):
+        yield filename, start, min(start + chunk_size, size), policy
+
+def audit_file(filename, policy, workers=None, chunk_size=CHUNK_SIZE):
+    shapes, malformed, empty = Counter(), 0, 0
+    jobs = _ranges(filename, policy, chunk_size)
+    if workers == 1:
+        results = map(_audit_range, jobs)
+    else:
+        pool = Pool(workers)
+        results = pool.imap_unordered(_audit_range, jobs)
+    try:
+        for part_shapes, part_malformed, part_empty in results:
+            shapes.update(part_shapes)
+            malformed += part_malformed
+            empty += part_empty
+    finally:
+        if workers != 1:
+            pool.terminate()
+    return summarize(policy, shapes, malformed, empty)
+
+def summarize(policy, shapes, malformed=0, empty=0):
+    # shapes of length 0 are blank lines and are left out; `empty` counts empty
+    # password fields, which are entries like any other and fail every check
+    stats = Counter()
+    required = [(f"missing_{name}", CLASS_MARKS[name][0]) for name in policy.required]
+    total_length = 0
+    items = [(shape, count) for shape, count in shapes.items() if shape[0]]
+    if empty:
+        items.append(((0, frozenset(), False, policy.min_bits is not None), empty))
+    for (length, marks, breached, weak), count in items:
+        failures = [name for name, mark in required if mark not in marks]
+        if length < max(policy.min_length, 1):
+            failures.append('too_short')
+        if OTHER_MARK[0] in marks:
+            failures.append('disallowed_chars')
+        if breached:
+            failures.append('breached')
+        if weak:
+            failures.append('weak')
+        for name in failures:
+            stats[name] += count
+        if not failures:
+            stats['compliant'] += count
+        stats['entries'] += count
+        total_length += length * count
+    if malformed:
+        stats['malformed'] = malformed
+    entries = stats['entries']
+    report = {name: stats[name] for name in sorted(stats)}
+    report['entries'] = entries
+    report['compliant'] = stats['compliant']
+    report['compliant_pct'] = round(100.0 * stats['compliant'] / entries, 2) if entries else 0.0
+    if entries:
+        lengths = [length for (length, _, _, _), _ in items]
+        report['min_length'] = min(lengths)
+        report['max_length'] = max(lengths)
+        report['mean_length'] = round(total_length / entries, 2)
+    return report
+
+def format_report(report):
+    lines = [f"Entries:    {report['entries']}",
+             f"Compliant:  {report['compliant']} ({report['compliant_pct']}%)"]
+    if 'min_length' in report:
+        lines.append(f"Length:     min {report['min_length']}, max {report['max_length']}, "
+                     f"mean {report['mean_length']}")
+    for name in sorted(report):
+        if name.startswith('missing_') or name in ('too_short', 'disallowed_chars',
+                                                   'breached', 'weak', 'malformed'):
+            lines.append(f"{name + ':':24}{report[name]}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check a file of passwords, one per line, against the generator's policy."
+    )
+    parser.add_argument("filename")
+    parser.add_argument("--min-length", type=int, default=12, help="shortest allowed password (default: %(default)s)")
+    parser.add_argument("--require", default="upper,lower,digits,symbols",
+                        help="character classes every password must use (default: %(default)s)")
+    parser.add_argument("--field", type=int,
+                        help="take the password from this 1-based field of each line")
+    parser.add_argument("--delimiter", default=",", help="field delimiter used with --field (default: %(default)r)")
+    parser.add_argument("--min-bits", type=float, help="also flag passwords below this estimated entropy")
+    parser.add_argument("--bloom", help="also flag passwords found in this breached-password filter")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-mb", type=int, default=CHUNK_SIZE // (1024 * 1024),
+                        help="bytes of input per task, in MiB (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if args.field is not None and args.field < 1:
+        parser.error("--field is 1-based")
+    if args.chunk_mb < 1:
+        parser.error("--chunk-mb must be at least 1")
+    try:
+        policy = AuditPolicy(args.min_length, [name for name in args.require.split(",") if name],
+                             args.min_bits, args.bloom, args.field,
+                             args.delimiter if args.field is not None else None)
+        if args.bloom:
+            # fail before starting the pool if the filter cannot be opened
+            BloomFilter(args.bloom).close()
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    report = audit_file(args.filename, policy, args.workers, args.chunk_mb * 1024 * 1024)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import json
+import os
+import queue
+import threading
+import time
+
+def write_json_atomic(filename, data, **dump_kwargs):
+    # write to a temp file next to the target and swap it in, so a crash
+    # never leaves a half-written file behind
+    tmp = filename + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+
+def batched(iterable, size):
+    # lists of up to `size` items, so streamed records can be handled a batch at a time
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class BackgroundWriter:
+    def __init__(self, delay=0.2, max_delay=2.0):
+        # changes arriving within `delay` seconds of each other share one write,
+        # but a steady stream of changes is still written every `max_delay`
+        self.delay = delay
+        self.max_delay = max_delay
+        self.errors = queue.Queue()
+        self._pending = {}  # key -> latest write callable
+        self._first = self._deadline = 0.0
+        self._flushing = 0
+        self._busy = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def schedule(self, key, write):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BackgroundWriter is closed")
+            now = time.monotonic()
+            if not self._pending:
+                self._first = now
+            self._pending[key] = write
+            self._deadline = min(now + self.delay, self._first + self.max_delay)
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # let a burst of changes settle before writing; every schedule()
+                # wakes this loop and pushes the deadline back
+                while not self._closed and not self._flushing:
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, {}
+                self._busy = True
+            for key, write in batch.items():
+                try:
+                    write()
+                except Exception as e:
+                    self.errors.put((key, e))
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def flush(self):
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                while self._pending or self._busy:
+                    self._cond.wait()
+            finally:
+                self._flushing -= 1
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def poll_errors(self, root, on_error, interval=250):
+        # Tk is not thread-safe, so errors are handed over on the event loop
+        while True:
+            try:
+                key, error = self.errors.get_nowait()
+            except queue.Empty:
+                break
+            on_error(key, error)
+        if not self._closed:
+            root.after(interval, self.poll_errors, root, on_error, interval)
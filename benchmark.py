@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from contactstore import INDEX_BATCH, ContactStore
+from todolist import ToDoList, SQLiteToDoList
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+BACKENDS = ["journal", "sqlite", "json"]
+# the non-journal "json" backend rewrites the whole file on every change and
+# is only useful for small sizes, so it is not run unless asked for
+DEFAULT_BACKENDS = ["journal", "sqlite"]
+
+def synthetic_tasks(count, seed=0):
+    rng = random.Random(seed)
+    start = date.today()
+    for i in range(count):
+        due = start + timedelta(days=rng.randint(-30, 90))
+        yield {
+            "description": f"Task {i} {rng.getrandbits(32):08x}",
+            "priority": rng.choice(["low", "medium", "high"]),
+            "due_date": due.isoformat() if rng.random() < 0.7 else None,
+            "completed": rng.random() < 0.2
+        }
+
+def synthetic_contacts(count, seed=0):
+    rng = random.Random(seed)
+    first = ["Madhu", "Nisha", "Kavi", "Arun", "Divya", "Ravi", "Priya", "Sanjay", "Lakshmi", "Vijay"]
+    cities = ["chennai", "chengalpet", "madurai", "coimbatore", "trichy"]
+    for i in range(count):
+        name = f"{rng.choice(first)} {i}"
+        yield {
+            "name": name,
+            "phone": f"{rng.randint(6, 9)}{rng.randint(0, 10 ** 9 - 1):09d}",
+            "email": f"{name.lower().replace(' ', '.')}@gmail.com",
+            "address": rng.choice(cities)
+        }
+
+class Recorder:
+    def __init__(self, out, trace_memory=True):
+        self.out = out
+        self.trace_memory = trace_memory
+
+    def measure(self, suite, backend, size, op, count, fn):
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        peak = None
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        record = {
+            "suite": suite,
+            "backend": backend,
+            "size": size,
+            "op": op,
+            "ops": count,
+            "seconds": round(seconds, 6),
+            "ops_per_sec": round(count / seconds, 1) if seconds > 0 else None,
+            "peak_bytes": peak
+        }
+        self.out.write(json.dumps(record) + "\n")
+        self.out.flush()
+        return result
+
+def open_backend(backend, directory):
+    if backend == "sqlite":
+        return SQLiteToDoList(os.path.join(directory, "todo.db"))
+    return ToDoList(os.path.join(directory, "todo.json"), journal=(backend == "journal"))
+
+def bench_todo(recorder, backend, size, directory, sample_ops=1000, batch_size=10000):
+    rng = random.Random(size)
+    todo = open_backend(backend, directory)
+
+    def populate():
+        batch = []
+        for item in synthetic_tasks(size):
+            batch.append(item)
+            if len(batch) == batch_size:
+                todo.add_tasks(batch)
+                batch = []
+        if batch:
+            todo.add_tasks(batch)
+    recorder.measure("todo", backend, size, "bulk_add", size, populate)
+    recorder.measure("todo", backend, size, "save", 1, todo.save_tasks)
+    todo.close()
+
+    todo = recorder.measure("todo", backend, size, "load", size,
+                            lambda: open_backend(backend, directory))
+    ops = min(sample_ops, size)
+
+    def add():
+        for i in range(ops):
+            todo.add_task(f"Extra {i}", "medium", None)
+    recorder.measure("todo", backend, size, "add", ops, add)
+
+    ids = rng.sample(range(1, size + 1), ops)
+
+    def complete():
+        for task_id in ids:
+            todo.complete_task(task_id)
+    recorder.measure("todo", backend, size, "complete", ops, complete)
+
+    def filter_tasks():
+        for _ in range(10):
+            todo.get_tasks()
+            todo.get_tasks(priority="high")
+    recorder.measure("todo", backend, size, "filter", 20, filter_tasks)
+
+    def delete():
+        for task_id in ids:
+            todo.delete_task(task_id)
+    recorder.measure("todo", backend, size, "delete", ops, delete)
+    todo.close()
+
+def bench_contacts(recorder, size, directory):
+    contacts = list(synthetic_contacts(size))
+    queries = ["madhu", "nisha 1", "984", "zzz", "kavi 99"]
+    for backend, filename in (("json", "contacts.json"), ("cbk", "contacts.cbk")):
+        store = ContactStore(os.path.join(directory, filename))
+        store.add_many(contacts)
+        recorder.measure("contacts", backend, size, "save", 1, store.save)
+        store.close()
+        store = recorder.measure("contacts", backend, size, "load", size,
+                                 lambda: ContactStore(os.path.join(directory, filename)))
+
+        def search():
+            for query in queries:
+                store.search(query)
+        # the app builds the indexes a step at a time on the event loop; one step
+        # is the longest the window waits, and the rest is only the total
+        step = min(size, INDEX_BATCH)
+        recorder.measure("contacts", backend, size, "index_step", step,
+                         lambda: store.build_indexes(step))
+        recorder.measure("contacts", backend, size, "index_rest", size - step, store.build_indexes)
+        recorder.measure("contacts", backend, size, "first_search", 1, lambda: store.search("madhu"))
+        recorder.measure("contacts", backend, size, "search", len(queries), search)
+        store.close()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the ToDoList and contact book data layers on synthetic data "
+                    "and print one JSON record per measurement."
+    )
+    parser.add_argument("--sizes", default=",".join(str(n) for n in DEFAULT_SIZES),
+                        help="comma-separated record counts (default: %(default)s)")
+    parser.add_argument("--backends", default=",".join(DEFAULT_BACKENDS),
+                        help="ToDoList backends to run, any of %s (default: %%(default)s)"
+                             % ",".join(BACKENDS))
+    parser.add_argument("--sample-ops", type=int, default=1000,
+                        help="single-task add/complete/delete calls timed per size "
+                             "(default: %(default)s)")
+    parser.add_argument("--suites", default="todo,contacts",
+                        help="which suites to run (default: %(default)s)")
+    parser.add_argument("--output", help="write results to this file instead of stdout")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip tracemalloc peak-memory tracking (faster, lower overhead)")
+    args = parser.parse_args()
+
+    sizes = [int(n) for n in args.sizes.split(",") if n]
+    backends = [b for b in args.backends.split(",") if b]
+    for backend in backends:
+        if backend not in BACKENDS:
+            parser.error(f"unknown backend: {backend}")
+    suites = set(args.suites.split(","))
+    out = open(args.output, 'w') if args.output else sys.stdout
+    recorder = Recorder(out, trace_memory=not args.no_memory)
+    try:
+        for size in sizes:
+            if "todo" in suites:
+                for backend in backends:
+                    with tempfile.TemporaryDirectory() as directory:
+                        bench_todo(recorder, backend, size, directory, args.sample_ops)
+            if "contacts" in suites:
+                with tempfile.TemporaryDirectory() as directory:
+                    bench_contacts(recorder, size, directory)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
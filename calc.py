@@ -1,12 +1,23 @@
 
+import queue
+import threading
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import ttk, filedialog, messagebox
+
+from calcbatch import require_numpy, run_batch
+from calcexpr import ExpressionError, compile_expression
+from calctable import Tabulation, save_table
+
+POLL_MS = 100
+PAGE_SIZE = 100
 
 class CalculatorApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Simple Calculator")
-        self.root.geometry("400x400")
+        self.root.geometry("400x580")
+        # result of the last calculation, available to expressions as "ans"
+        self.ans = 0.0
         
         self.create_widgets()
         
@@ -29,40 +40,272 @@ class CalculatorApp:
         tk.Button(operations_frame, text="*", width=5, command=lambda: self.calculate('*')).grid(row=0, column=2, padx=5)
         tk.Button(operations_frame, text="/", width=5, command=lambda: self.calculate('/')).grid(row=0, column=3, padx=5)
         
+        # Expression entry; a and b are the numbers above, ans the last result
+        tk.Label(self.root, text="Expression (use a, b, ans):").pack(pady=5)
+        expression_frame = tk.Frame(self.root)
+        expression_frame.pack(pady=5)
+        self.expression_entry = tk.Entry(expression_frame, width=28)
+        self.expression_entry.pack(side='left', padx=5)
+        self.expression_entry.bind('<Return>', lambda event: self.evaluate_expression())
+        tk.Button(expression_frame, text="=", width=3, command=self.evaluate_expression).pack(side='left')
+        
         # Result display
         self.result_label = tk.Label(self.root, text="", font=('Arial', 14))
         self.result_label.pack(pady=20)
         
         # Clear button
         tk.Button(self.root, text="Clear", command=self.clear_fields).pack(pady=10)
+        
+        # Batch mode over the columns of a CSV file, and tabulation of f(x)
+        tools_frame = tk.Frame(self.root)
+        tools_frame.pack(pady=5)
+        tk.Button(tools_frame, text="Batch CSV...", command=self.open_batch_dialog).pack(side='left', padx=5)
+        tk.Button(tools_frame, text="Tabulate...", command=self.open_table_dialog).pack(side='left', padx=5)
     
-    def calculate(self, operation):
+    def _variables(self, names):
+        env = {'ans': self.ans}
+        for name, entry in (('a', self.num1_entry), ('b', self.num2_entry)):
+            if name in names:
+                env[name] = float(entry.get())
+        return env
+    
+    def _evaluate(self, text):
+        compiled = compile_expression(text)
         try:
-            num1 = float(self.num1_entry.get())
-            num2 = float(self.num2_entry.get())
-            
-            if operation == '+':
-                result = num1 + num2
-                self.result_label.config(text=f"Result: {num1} + {num2} = {result}")
-            elif operation == '-':
-                result = num1 - num2
-                self.result_label.config(text=f"Result: {num1} - {num2} = {result}")
-            elif operation == '*':
-                result = num1 * num2
-                self.result_label.config(text=f"Result: {num1} * {num2} = {result}")
-            elif operation == '/':
-                if num2 == 0:
-                    messagebox.showerror("Error", "Division by zero is not allowed!")
-                    return
-                result = num1 / num2
-                self.result_label.config(text=f"Result: {num1} / {num2} = {result}")
-            
+            env = self._variables(compiled.variables)
         except ValueError:
             messagebox.showerror("Error", "Please enter valid numbers!")
+            return None
+        try:
+            result = compiled.evaluate(env)
+        except ZeroDivisionError:
+            messagebox.showerror("Error", "Division by zero is not allowed!")
+            return None
+        except (ArithmeticError, ValueError, TypeError) as e:
+            messagebox.showerror("Error", f"Cannot evaluate expression:\n{e}")
+            return None
+        self.ans = result
+        return env, result
+    
+    def calculate(self, operation):
+        evaluated = self._evaluate(f"a {operation} b")
+        if evaluated is not None:
+            env, result = evaluated
+            self.result_label.config(text=f"Result: {env['a']} {operation} {env['b']} = {result}")
+    
+    def evaluate_expression(self):
+        text = self.expression_entry.get()
+        try:
+            evaluated = self._evaluate(text)
+        except ExpressionError as e:
+            messagebox.showerror("Error", f"Invalid expression:\n{e}")
+            return
+        if evaluated is not None:
+            self.result_label.config(text=f"Result: {text.strip()} = {evaluated[1]}")
+    
+    def _run_in_background(self, work, on_progress, on_done):
+        # Tk is not thread-safe, so the worker only posts to a queue that the
+        # event loop drains
+        events = queue.Queue()
+        def run():
+            try:
+                result = work(lambda value: events.put(('progress', value)))
+            except Exception as e:
+                events.put(('error', e))
+            else:
+                events.put(('done', result))
+        threading.Thread(target=run, daemon=True).start()
+        self.root.after(POLL_MS, self._poll_job, events, on_progress, on_done)
+    
+    def _poll_job(self, events, on_progress, on_done):
+        while True:
+            try:
+                kind, value = events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                on_progress(value)
+            else:
+                on_done(kind, value)
+                return
+        self.root.after(POLL_MS, self._poll_job, events, on_progress, on_done)
+    
+    def open_batch_dialog(self):
+        try:
+            require_numpy()
+        except RuntimeError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Batch CSV")
+        expression = self.expression_entry.get().strip() or "a / b"
+        fields = {
+            'source': tk.StringVar(),
+            'target': tk.StringVar(),
+            'columns': tk.StringVar(),
+            'expression': tk.StringVar(value=expression),
+        }
+        rows = [
+            ("Input CSV:", 'source', lambda: fields['source'].set(
+                filedialog.askopenfilename(parent=dialog, filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]))),
+            ("Output CSV:", 'target', lambda: fields['target'].set(
+                filedialog.asksaveasfilename(parent=dialog, defaultextension=".csv",
+                                             filetypes=[("CSV files", "*.csv")]))),
+            ("Columns (a, b, ...):", 'columns', None),
+            ("Expression:", 'expression', None),
+        ]
+        for row, (text, key, browse) in enumerate(rows):
+            tk.Label(dialog, text=text).grid(row=row, column=0, sticky='w', padx=5, pady=3)
+            tk.Entry(dialog, textvariable=fields[key], width=32).grid(row=row, column=1, padx=5, pady=3)
+            if browse is not None:
+                tk.Button(dialog, text="Browse...", command=browse).grid(row=row, column=2, padx=5)
+        status = tk.Label(dialog, text="")
+        status.grid(row=len(rows), column=0, columnspan=3, pady=5)
+        run_btn = tk.Button(dialog, text="Run",
+                            command=lambda: self.start_batch(fields, status, run_btn))
+        run_btn.grid(row=len(rows) + 1, column=0, columnspan=3, pady=5)
+    
+    def start_batch(self, fields, status, run_btn):
+        # read the Tk variables here; the worker thread must not touch them
+        source, target = fields['source'].get(), fields['target'].get()
+        columns = [column.strip() for column in fields['columns'].get().split(",") if column.strip()]
+        expression = fields['expression'].get()
+        if not source or not target:
+            messagebox.showerror("Error", "Please choose input and output files!")
+            return
+        run_btn.config(state='disabled')
+        status.config(text="Running...")
+        
+        def done(kind, value):
+            if not status.winfo_exists():
+                return  # the dialog was closed while the batch ran
+            run_btn.config(state='normal')
+            if kind == 'error':
+                status.config(text="")
+                messagebox.showerror("Error", f"Batch failed:\n{value}")
+                return
+            rows, errors = value
+            status.config(text=f"Done: {rows} rows, {errors} without a valid result")
+        
+        self._run_in_background(
+            lambda progress: run_batch(source, target, columns, expression, progress=progress),
+            lambda rows: status.winfo_exists() and status.config(text=f"Processed {rows} rows..."),
+            done
+        )
+    
+    def open_table_dialog(self):
+        try:
+            require_numpy()
+        except RuntimeError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Tabulate f(x)")
+        # start from the calculator's expression when it is a function of x
+        expression = self.expression_entry.get().strip()
+        try:
+            if not compile_expression(expression).variables <= {'x'}:
+                expression = "sin(x)"
+        except ExpressionError:
+            expression = "sin(x)"
+        fields = {
+            'expression': tk.StringVar(value=expression),
+            'start': tk.StringVar(value="0"),
+            'stop': tk.StringVar(value="1"),
+            'points': tk.StringVar(value="101"),
+        }
+        form = tk.Frame(dialog)
+        form.pack(padx=5, pady=5)
+        for column, (text, key, width) in enumerate((("f(x) =", 'expression', 18), ("from", 'start', 7),
+                                                     ("to", 'stop', 7), ("points", 'points', 9))):
+            tk.Label(form, text=text).grid(row=0, column=2 * column, padx=(5, 2))
+            tk.Entry(form, textvariable=fields[key], width=width).grid(row=0, column=2 * column + 1)
+        
+        tree = ttk.Treeview(dialog, columns=('x', 'y'), show='headings', height=15)
+        tree.heading('x', text='x')
+        tree.heading('y', text='f(x)')
+        tree.pack(fill='both', expand=True, padx=5)
+        
+        nav = tk.Frame(dialog)
+        nav.pack(pady=5)
+        view = {'table': None, 'page': 0}
+        page_label = tk.Label(nav, text="", width=24)
+        
+        def show_page(page):
+            # only the rows on screen are ever evaluated
+            table = view['table']
+            pages = max(1, -(-len(table) // PAGE_SIZE))
+            view['page'] = page = max(0, min(page, pages - 1))
+            x, y, invalid = table.rows(page * PAGE_SIZE, (page + 1) * PAGE_SIZE)
+            tree.delete(*tree.get_children())
+            for xv, yv, bad in zip(x.tolist(), y.tolist(), invalid.tolist()):
+                tree.insert('', 'end', values=(f"{xv:.10g}", "undefined" if bad else f"{yv:.10g}"))
+            page_label.config(text=f"Page {page + 1} of {pages}")
+        
+        def tabulate():
+            try:
+                table = Tabulation(fields['expression'].get(), float(fields['start'].get()),
+                                   float(fields['stop'].get()), int(fields['points'].get()))
+                # evaluating the first page also catches calls with the wrong arguments
+                view['table'] = table
+                show_page(0)
+            except (ExpressionError, TypeError) as e:
+                view['table'] = None
+                messagebox.showerror("Error", f"Invalid expression:\n{e}", parent=dialog)
+            except ValueError as e:
+                view['table'] = None
+                messagebox.showerror("Error", f"Please enter a valid range:\n{e}", parent=dialog)
+        
+        def turn(delta):
+            if view['table'] is not None:
+                show_page(view['page'] + delta)
+        
+        tk.Button(nav, text="< Prev", command=lambda: turn(-1)).pack(side='left', padx=5)
+        page_label.pack(side='left')
+        tk.Button(nav, text="Next >", command=lambda: turn(1)).pack(side='left', padx=5)
+        
+        actions = tk.Frame(dialog)
+        actions.pack(pady=5)
+        status = tk.Label(dialog, text="")
+        tk.Button(actions, text="Tabulate", command=tabulate).pack(side='left', padx=5)
+        save_btn = tk.Button(actions, text="Save...",
+                             command=lambda: self.save_table(view['table'], dialog, status, save_btn))
+        save_btn.pack(side='left', padx=5)
+        status.pack(pady=(0, 5))
+        tabulate()
+    
+    def save_table(self, table, dialog, status, save_btn):
+        if table is None:
+            return
+        filename = filedialog.asksaveasfilename(
+            parent=dialog, defaultextension=".npy",
+            filetypes=[("NumPy array", "*.npy"), ("CSV files", "*.csv")]
+        )
+        if not filename:
+            return
+        save_btn.config(state='disabled')
+        total = len(table)
+        
+        def done(kind, value):
+            if not status.winfo_exists():
+                return  # the dialog was closed while saving
+            save_btn.config(state='normal')
+            if kind == 'error':
+                status.config(text="")
+                messagebox.showerror("Error", f"Save failed:\n{value}", parent=dialog)
+                return
+            status.config(text=f"Saved {value} points")
+        
+        self._run_in_background(
+            lambda progress: save_table(table, filename, progress),
+            lambda points: status.winfo_exists() and status.config(text=f"Saving... {100 * points // total}%"),
+            done
+        )
     
     def clear_fields(self):
         self.num1_entry.delete(0, tk.END)
         self.num2_entry.delete(0, tk.END)
+        self.expression_entry.delete(0, tk.END)
         self.result_label.config(text="")
 
 def main():
@@ -0,0 +1,177 @@
+import argparse
+import csv
+import os
+import string
+from functools import lru_cache, reduce
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from calcexpr import CONSTANTS, FUNCTIONS, ExpressionError, compile_expression, compile_node
+
+CHUNK_ROWS = 65536
+# columns are bound to a, b, c, d, f, ... in the order they are given; letters
+# the parser reads as a constant or function, such as e, are skipped
+VARIABLES = ''.join(name for name in string.ascii_lowercase
+                    if name not in CONSTANTS and name not in FUNCTIONS)
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("Batch mode needs NumPy. Install it with: pip install numpy")
+
+def _log(x, base=None):
+    return np.log(x) if base is None else np.log(x) / np.log(base)
+
+@lru_cache(maxsize=1)
+def numpy_tables():
+    require_numpy()
+    functions = {
+        'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+        'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan,
+        'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+        'sqrt': np.sqrt, 'exp': np.exp, 'log': _log, 'log10': np.log10,
+        'abs': np.abs, 'floor': np.floor, 'ceil': np.ceil, 'round': np.round,
+        'min': lambda *args: reduce(np.minimum, args),
+        'max': lambda *args: reduce(np.maximum, args),
+    }
+    operators = {
+        '+': np.add, '-': np.subtract, '*': np.multiply,
+        '/': np.divide, '%': np.mod, '^': np.power,
+    }
+    return functions, operators
+
+@lru_cache(maxsize=64)
+def compile_vectorized(text):
+    # the same AST as the scalar engine, compiled against NumPy ufuncs so one
+    # call evaluates a whole array
+    tree = compile_expression(text).tree
+    functions, operators = numpy_tables()
+    with np.errstate(all='ignore'):
+        # constant subtrees are folded here, and 1/0 folds to inf quietly
+        return compile_node(tree, functions, operators)
+
+def evaluate_vectorized(text, env, size):
+    # errors such as division by zero become inf/nan for the affected rows
+    # only; the mask marks rows whose result is not a finite number
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        result = compile_vectorized(text)(env)
+        result = np.broadcast_to(np.asarray(result, dtype=np.float64), (size,))
+    return result, ~np.isfinite(result)
+
+def parse_column(values):
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        # a bad cell only spoils its own row
+        return np.fromiter((_to_float(value) for value in values), np.float64, len(values))
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+def _resolve_columns(columns, header):
+    indexes = []
+    for column in columns:
+        if header is not None and column in header:
+            indexes.append(header.index(column))
+        elif column.isdigit() and int(column) >= 1:
+            indexes.append(int(column) - 1)
+        else:
+            raise ValueError(f"No such column: {column}")
+    return indexes
+
+def _format(values, invalid):
+    return ['' if bad else repr(value) for value, bad in zip(values.tolist(), invalid.tolist())]
+
+def run_batch(source, target, columns, expression, has_header=True, delimiter=',',
+              chunk_rows=CHUNK_ROWS, progress=None):
+    # streams source in chunks of rows, appending the expression's result to
+    # every row of target; rows whose result is invalid get an empty cell
+    require_numpy()
+    if not columns:
+        raise ValueError("Choose at least one column")
+    if len(columns) > len(VARIABLES):
+        raise ValueError(f"At most {len(VARIABLES)} columns can be used")
+    names = VARIABLES[:len(columns)]
+    unknown = compile_expression(expression).variables - set(names)
+    if unknown:
+        raise ExpressionError(f"Unknown variable {sorted(unknown)[0]!r}")
+    compile_vectorized(expression)
+    tmp = target + ".tmp"
+    try:
+        rows, errors = _run_batch(source, tmp, columns, names, expression,
+                                  has_header, delimiter, chunk_rows, progress)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, target)
+    return rows, errors
+
+def _run_batch(source, target, columns, names, expression, has_header, delimiter,
+               chunk_rows, progress):
+    rows = errors = 0
+    with open(source, 'r', newline='', encoding='utf-8') as fin, \
+            open(target, 'w', newline='', encoding='utf-8') as fout:
+        reader = csv.reader(fin, delimiter=delimiter)
+        writer = csv.writer(fout, delimiter=delimiter)
+        header = next(reader, None) if has_header else None
+        indexes = _resolve_columns(columns, header)
+        if header is not None:
+            writer.writerow(header + ['result'])
+        while True:
+            chunk = []
+            for row in reader:
+                chunk.append(row)
+                if len(chunk) == chunk_rows:
+                    break
+            if not chunk:
+                break
+            env = {}
+            for name, index in zip(names, indexes):
+                env[name] = parse_column([row[index] if index < len(row) else '' for row in chunk])
+            result, invalid = evaluate_vectorized(expression, env, len(chunk))
+            for row, value in zip(chunk, _format(result, invalid)):
+                row.append(value)
+            writer.writerows(chunk)
+            rows += len(chunk)
+            errors += int(invalid.sum())
+            if progress is not None:
+                progress(rows)
+    return rows, errors
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Apply an expression to columns of a CSV file, a chunk of rows at a time."
+    )
+    parser.add_argument("source")
+    parser.add_argument("target")
+    parser.add_argument("-c", "--columns", required=True,
+                        help="comma-separated column names or 1-based numbers, "
+                             "bound to a, b, c, d, f, ... (e is Euler's number)")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--op", choices=['+', '-', '*', '/'], help="combine the first two columns")
+    group.add_argument("-e", "--expr", help="expression over a, b, c, d, f, ...")
+    parser.add_argument("--no-header", action="store_true", help="the first row is data, not column names")
+    parser.add_argument("--delimiter", default=",", help="field delimiter (default: %(default)r)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help="rows evaluated per chunk (default: %(default)s)")
+    args = parser.parse_args()
+
+    expression = f"a {args.op} b" if args.op else args.expr
+    columns = [column.strip() for column in args.columns.split(",") if column.strip()]
+    if args.chunk_rows < 1:
+        parser.error("--chunk-rows must be at least 1")
+    try:
+        rows, errors = run_batch(args.source, args.target, columns, expression,
+                                 not args.no_header, args.delimiter, args.chunk_rows)
+    except (RuntimeError, ValueError, OSError) as e:
+        parser.error(str(e))
+    print(f"Wrote {rows} rows to {args.target} ({errors} without a valid result)")
+
+if __name__ == "__main__":
+    main()
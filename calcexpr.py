@@ -0,0 +1,240 @@
+import math
+import operator
+import re
+from functools import lru_cache
+
+CACHE_SIZE = 256
+
+class ExpressionError(ValueError):
+    def __init__(self, message, position=None):
+        if position is not None:
+            message = f"{message} at position {position + 1}"
+        super().__init__(message)
+        self.position = position
+
+TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<name>[A-Za-z_][A-Za-z_0-9]*)
+      | (?P<op>\*\*|[-+*/%^(),])
+    )""", re.VERBOSE)
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN.match(text, pos)
+        if match is None:
+            start = len(text) - len(text[pos:].lstrip())
+            raise ExpressionError(f"Unexpected character {text[start]!r}", start)
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'op' and value == '**':
+            value = '^'
+        tokens.append((kind, value, match.start(kind)))
+        pos = match.end()
+    tokens.append(('end', None, len(text)))
+    return tokens
+
+# the AST is nested tuples:
+#   ('num', value)  ('var', name)  ('neg', operand)
+#   ('bin', op, left, right)  ('call', name, args)
+class Parser:
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.index = 0
+
+    def peek(self):
+        return self.tokens[self.index]
+
+    def take(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def expect(self, value):
+        kind, found, pos = self.take()
+        if found != value:
+            raise ExpressionError(f"Expected {value!r}", pos)
+
+    def parse(self):
+        if self.peek()[0] == 'end':
+            raise ExpressionError("Empty expression")
+        node = self.expression()
+        kind, value, pos = self.peek()
+        if kind != 'end':
+            raise ExpressionError(f"Unexpected {value!r}", pos)
+        return node
+
+    def expression(self):
+        node = self.term()
+        while self.peek()[1] in ('+', '-'):
+            op = self.take()[1]
+            node = ('bin', op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek()[1] in ('*', '/', '%'):
+            op = self.take()[1]
+            node = ('bin', op, node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek()[1] in ('-', '+'):
+            op = self.take()[1]
+            operand = self.unary()
+            return ('neg', operand) if op == '-' else operand
+        return self.power()
+
+    def power(self):
+        # right-associative and tighter than unary minus on its left: -2^2 == -4
+        node = self.atom()
+        if self.peek()[1] == '^':
+            self.take()
+            node = ('bin', '^', node, self.unary())
+        return node
+
+    def atom(self):
+        kind, value, pos = self.take()
+        if kind == 'number':
+            return ('num', float(value))
+        if kind == 'name':
+            if self.peek()[1] == '(':
+                self.take()
+                args = []
+                if self.peek()[1] != ')':
+                    args.append(self.expression())
+                    while self.peek()[1] == ',':
+                        self.take()
+                        args.append(self.expression())
+                self.expect(')')
+                if value not in FUNCTIONS:
+                    raise ExpressionError(f"Unknown function {value!r}", pos)
+                check_arity(value, len(args), pos)
+                return ('call', value, tuple(args))
+            if value in CONSTANTS:
+                return ('num', CONSTANTS[value])
+            return ('var', value)
+        if value == '(':
+            node = self.expression()
+            self.expect(')')
+            return node
+        if kind == 'end':
+            raise ExpressionError("Unexpected end of expression", pos)
+        raise ExpressionError(f"Unexpected {value!r}", pos)
+
+def parse(text):
+    return Parser(text).parse()
+
+CONSTANTS = {'pi': math.pi, 'e': math.e, 'tau': math.tau}
+FUNCTIONS = {
+    'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+    'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
+    'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh,
+    'sqrt': math.sqrt, 'exp': math.exp, 'log': math.log, 'log10': math.log10,
+    'abs': abs, 'floor': math.floor, 'ceil': math.ceil, 'round': round,
+    'min': min, 'max': max,
+}
+# (fewest, most) arguments, most None for any number; functions not listed
+# take exactly one. Checked for every backend, as NumPy ufuncs would take an
+# extra argument as their output array.
+ARITY = {'log': (1, 2), 'min': (2, None), 'max': (2, None)}
+OPERATORS = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul,
+    # math.pow raises for a negative base with a fractional exponent instead of
+    # returning a complex number
+    '/': operator.truediv, '%': operator.mod, '^': math.pow,
+}
+
+def check_arity(name, count, position=None):
+    low, high = ARITY.get(name, (1, 1))
+    if count >= low and (high is None or count <= high):
+        return
+    if high is None:
+        expected = f"at least {low} arguments"
+    elif low == high:
+        expected = f"{low} argument" + ("s" if low != 1 else "")
+    elif high == low + 1:
+        expected = f"{low} or {high} arguments"
+    else:
+        expected = f"{low} to {high} arguments"
+    raise ExpressionError(f"{name}() takes {expected}, got {count}", position)
+
+def _variables(node, found):
+    if node[0] == 'var':
+        found.add(node[1])
+    elif node[0] == 'neg':
+        _variables(node[1], found)
+    elif node[0] == 'bin':
+        _variables(node[2], found)
+        _variables(node[3], found)
+    elif node[0] == 'call':
+        for arg in node[2]:
+            _variables(arg, found)
+    return found
+
+def _compile(node, functions, operators):
+    # returns (closure taking a dict of variables, whether the subtree is constant)
+    kind = node[0]
+    if kind == 'num':
+        value = node[1]
+        return (lambda env: value), True
+    if kind == 'var':
+        name = node[1]
+        def variable(env):
+            try:
+                return env[name]
+            except KeyError:
+                raise ExpressionError(f"Unknown variable {name!r}") from None
+        return variable, False
+    if kind == 'neg':
+        operand, constant = _compile(node[1], functions, operators)
+        evaluate = lambda env: -operand(env)
+    elif kind == 'bin':
+        op = operators[node[1]]
+        left, left_constant = _compile(node[2], functions, operators)
+        right, right_constant = _compile(node[3], functions, operators)
+        evaluate = lambda env: op(left(env), right(env))
+        constant = left_constant and right_constant
+    else:
+        check_arity(node[1], len(node[2]))
+        function = functions[node[1]]
+        compiled = [_compile(arg, functions, operators) for arg in node[2]]
+        args = [arg for arg, _ in compiled]
+        evaluate = lambda env: function(*[arg(env) for arg in args])
+        constant = all(arg_constant for _, arg_constant in compiled)
+    if constant:
+        # fold constant subtrees once, at compile time
+        try:
+            value = evaluate({})
+        except (ArithmeticError, ValueError, TypeError):
+            # leave the error to be raised when the expression is evaluated
+            return evaluate, False
+        return (lambda env: value), True
+    return evaluate, False
+
+def compile_node(node, functions=FUNCTIONS, operators=OPERATORS):
+    return _compile(node, functions, operators)[0]
+
+class CompiledExpression:
+    def __init__(self, text):
+        self.text = text
+        self.tree = parse(text)
+        self.variables = frozenset(_variables(self.tree, set()))
+        self.evaluate = compile_node(self.tree)
+
+    def __call__(self, **env):
+        return self.evaluate(env)
+
+    def __repr__(self):
+        return f"CompiledExpression({self.text!r})"
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(text):
+    # keyed by the exact text, so re-evaluating a recent expression skips parsing
+    return CompiledExpression(text)
+
+def evaluate(text, **env):
+    return compile_expression(text).evaluate(env)
@@ -0,0 +1,126 @@
+import argparse
+import csv
+import os
+import sys
+
+from calcbatch import compile_vectorized, evaluate_vectorized, np, require_numpy
+from calcexpr import ExpressionError, compile_expression
+
+CHUNK_POINTS = 1 << 20
+MAX_POINTS = 10 ** 9
+
+class Tabulation:
+    # f(x) at `points` evenly spaced x from start to stop inclusive; nothing is
+    # computed up front, any slice of the table is evaluated on demand
+    def __init__(self, expression, start, stop, points):
+        require_numpy()
+        if not 1 <= points <= MAX_POINTS:
+            raise ValueError(f"Number of points must be between 1 and {MAX_POINTS}")
+        unknown = compile_expression(expression).variables - {'x'}
+        if unknown:
+            raise ExpressionError(f"Unknown variable {sorted(unknown)[0]!r}; use x")
+        compile_vectorized(expression)
+        self.expression = expression
+        self.start = float(start)
+        self.stop = float(stop)
+        self.points = points
+        self.step = (self.stop - self.start) / (points - 1) if points > 1 else 0.0
+
+    def __len__(self):
+        return self.points
+
+    def x(self, first, last):
+        x = self.start + self.step * np.arange(first, last, dtype=np.float64)
+        if last == self.points and last > first and self.points > 1:
+            # pin the end point so rounding in start + step * i cannot miss it
+            x[-1] = self.stop
+        return x
+
+    def rows(self, first, last):
+        # (x, y, invalid) for points first..last-1; invalid marks points where
+        # f is undefined, such as a division by zero
+        first, last = max(0, first), min(last, self.points)
+        x = self.x(first, last)
+        y, invalid = evaluate_vectorized(self.expression, {'x': x}, len(x))
+        return x, y, invalid
+
+    def chunks(self, size=CHUNK_POINTS):
+        for first in range(0, self.points, size):
+            yield self.rows(first, first + size)
+
+def save_npy(table, filename, progress=None):
+    # an (N, 2) float64 array of (x, y) rows, undefined y stored as NaN; the
+    # header is written up front so the rows can follow chunk by chunk
+    tmp = filename + ".tmp"
+    try:
+        with open(tmp, 'wb') as f:
+            np.lib.format.write_array_header_1_0(f, {
+                'descr': np.lib.format.dtype_to_descr(np.dtype(np.float64)),
+                'fortran_order': False,
+                'shape': (len(table), 2),
+            })
+            done = 0
+            for x, y, invalid in table.chunks():
+                np.column_stack((x, np.where(invalid, np.nan, y))).tofile(f)
+                done += len(x)
+                if progress is not None:
+                    progress(done)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, filename)
+    return len(table)
+
+def write_csv(table, out, progress=None):
+    writer = csv.writer(out)
+    writer.writerow(['x', 'f(x)'])
+    done = 0
+    for x, y, invalid in table.chunks():
+        writer.writerows(zip(x.tolist(), ['' if bad else value
+                                          for value, bad in zip(y.tolist(), invalid.tolist())]))
+        done += len(x)
+        if progress is not None:
+            progress(done)
+    return done
+
+def save_csv(table, filename, progress=None):
+    tmp = filename + ".tmp"
+    try:
+        with open(tmp, 'w', newline='') as f:
+            write_csv(table, f, progress)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, filename)
+    return len(table)
+
+def save_table(table, filename, progress=None):
+    if filename.lower().endswith('.npy'):
+        return save_npy(table, filename, progress)
+    return save_csv(table, filename, progress)
+
+def main():
+    parser = argparse.ArgumentParser(description="Tabulate f(x) at evenly spaced points from a to b.")
+    parser.add_argument("expression", help="expression in x, e.g. 'sin(x) / x'")
+    parser.add_argument("start", type=float)
+    parser.add_argument("stop", type=float)
+    parser.add_argument("-n", "--points", type=int, default=11,
+                        help="number of points, both ends included (default: %(default)s)")
+    parser.add_argument("-o", "--output", help="write to this .npy or .csv file instead of stdout")
+    args = parser.parse_args()
+
+    try:
+        table = Tabulation(args.expression, args.start, args.stop, args.points)
+        if args.output:
+            save_table(table, args.output)
+        else:
+            write_csv(table, sys.stdout)
+    except (RuntimeError, ValueError, OSError) as e:
+        parser.error(str(e))
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,137 @@
 
+import csv
+import sys
 import tkinter as tk
-from tkinter import ttk, messagebox
-import json
-import os
+from tkinter import ttk, messagebox, filedialog
+
+from background_writer import BackgroundWriter
+from contactstore import INDEX_BATCH, ContactStore, export_contacts, import_contacts
+
+SEARCH_DELAY_MS = 250
+
+class VirtualTreeview:
+    # shows a window onto a (possibly huge) list of keys: only the rows around
+    # the visible area exist as Treeview items, and the scrollbar is driven from
+    # the position in the full list rather than from the Treeview itself
+    def __init__(self, tree, scrollbar, row_values, on_select=None, overscan=20):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_values = row_values
+        # called when the user picks a different key, not when render() restores
+        # the selection of a row that pages back in
+        self.on_select = on_select
+        self.overscan = overscan
+        self.keys = []
+        self.top = 0        # index of the first visible row in self.keys
+        self.start = 0      # index of the first materialized row
+        self.selected_key = None
+        scrollbar.configure(command=self.yview)
+        tree.configure(yscrollcommand=self._on_tree_scroll)
+        tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+        tree.bind('<MouseWheel>', lambda e: self._wheel(-1 if e.delta > 0 else 1))
+        tree.bind('<Button-4>', lambda e: self._wheel(-1))
+        tree.bind('<Button-5>', lambda e: self._wheel(1))
+
+    def page_size(self):
+        return int(self.tree.cget('height'))
+
+    def set_keys(self, keys, reset=False):
+        self.keys = keys
+        self.top = 0 if reset else self.top
+        self.render(refresh=True)
+
+    def clear_selection(self):
+        self.selected_key = None
+        self.tree.selection_set(())
+
+    def _clamp(self, top):
+        return max(0, min(top, len(self.keys) - self.page_size()))
+
+    def render(self, refresh=False):
+        self.top = self._clamp(self.top)
+        height = self.page_size()
+        self.start = max(0, self.top - self.overscan)
+        end = min(len(self.keys), self.top + height + self.overscan)
+        wanted = [str(key) for key in self.keys[self.start:end]]
+        wanted_set = set(wanted)
+        existing = self.tree.get_children()
+        stale = [iid for iid in existing if iid not in wanted_set]
+        if stale:
+            self.tree.delete(*stale)
+        existing = set(existing).difference(stale)
+        for i, iid in enumerate(wanted):
+            if iid not in existing:
+                self.tree.insert('', i, iid=iid, values=self.row_values(self.keys[self.start + i]))
+            elif refresh:
+                self.tree.item(iid, values=self.row_values(self.keys[self.start + i]))
+        # scrolling keeps surviving rows in order, but new keys (such as ranked
+        # fuzzy results) can reorder them, so put any row out of place back
+        shown = list(self.tree.get_children())
+        if shown != wanted:
+            for i, iid in enumerate(wanted):
+                if shown[i] != iid:
+                    self.tree.move(iid, '', i)
+                    shown.remove(iid)
+                    shown.insert(i, iid)
+        if self.selected_key is not None and str(self.selected_key) in wanted_set:
+            if self.tree.selection() != (str(self.selected_key),):
+                self.tree.selection_set(str(self.selected_key))
+        if wanted:
+            self.tree.yview_moveto((self.top - self.start) / len(wanted))
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.keys)
+        if total <= self.page_size():
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.top / total, (self.top + self.page_size()) / total)
+
+    def yview(self, *args):
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self.keys))
+        elif args[0] == 'scroll':
+            step = self.page_size() if args[2] == 'pages' else 1
+            self.top += int(args[1]) * step
+        self.render()
+
+    def _wheel(self, direction):
+        self.top += direction * 3
+        self.render()
+        return 'break'
+
+    def _on_tree_scroll(self, first, last):
+        # the Treeview scrolled on its own (keyboard, see()); page in around the new position
+        count = len(self.tree.get_children())
+        top = self.start + round(float(first) * count)
+        if count and top != self.top:
+            self.top = top
+            self.render()
+
+    def _on_select(self, event):
+        selected = self.tree.selection()
+        if not selected:
+            return
+        key = int(selected[0])
+        if key != self.selected_key:
+            self.selected_key = key
+            if self.on_select is not None:
+                self.on_select()
 
 class ContactBookApp:
-    def __init__(self, root):
+    def __init__(self, root, data_file="contacts.json"):
         self.root = root
         self.root.title("Colorful Contact Book")
         self.root.geometry("900x700")
         self.root.configure(bg='#f0f8ff')
         
-        # Data file
-        self.data_file = "contacts.json"
-        self.contacts = []
-        self.load_contacts()
+        # Data file (contacts.json, or a compact .cbk file for large books)
+        self.data_file = data_file
+        self.writer = BackgroundWriter()
+        self.store = ContactStore(self.data_file, self.writer)
+        self.search_job = None
+        self.import_job = None
+        self.import_progress = (0, 0)
         
         # Colors
         self.colors = {
@@ -27,18 +144,45 @@ class ContactBookApp:
         
         # Create UI
         self.create_widgets()
+        self.writer.poll_errors(self.root, self.show_save_error)
+        self.root.after(1, self._index_step)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def load_contacts(self):
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                try:
-                    self.contacts = json.load(f)
-                except json.JSONDecodeError:
-                    self.contacts = []
+        self.store.load()
     
     def save_contacts(self):
-        with open(self.data_file, 'w') as f:
-            json.dump(self.contacts, f, indent=2)
+        self.store.save()
+    
+    def _confirm_not_duplicate(self, contact, exclude=None):
+        duplicates = self.store.find_duplicates(contact, exclude)
+        if not duplicates:
+            return True
+        existing = self.store.get(duplicates[0])
+        return messagebox.askyesno(
+            "Possible Duplicate",
+            f"{existing['name']} ({existing['phone']}) has the same phone number or email.\n"
+            "Save anyway?"
+        )
+    
+    def _index_step(self):
+        # build the search indexes a slice at a time so a large book never
+        # freezes the window; a search before they are done finishes them
+        if self.store.build_indexes(INDEX_BATCH):
+            if self.import_job is None:
+                self.status_var.set("")
+            return
+        if self.import_job is None:
+            self.status_var.set(f"Indexing: {self.store.indexed_count()} of {len(self.store)}")
+        self.root.after(1, self._index_step)
+    
+    def show_save_error(self, filename, error):
+        messagebox.showerror("Error", f"Failed to save {filename}:\n{error}")
+    
+    def on_close(self):
+        self.writer.close()
+        self.store.close()
+        self.root.destroy()
     
     def create_widgets(self):
         # Header frame
@@ -72,11 +216,12 @@ class ContactBookApp:
         self.contact_list.column('phone', width=120)
         self.contact_list.pack(padx=10, pady=5)
         
-        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.contact_list.yview)
-        self.contact_list.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(list_frame, orient='vertical')
         scrollbar.pack(side='right', fill='y')
-        
-        self.contact_list.bind('<<TreeviewSelect>>', self.display_contact_details)
+        # only the rows around the visible window are materialized
+        self.list_view = VirtualTreeview(self.contact_list, scrollbar, self._row_values,
+                                         self.display_contact_details)
+        self.last_query = ('', False)
         
         # Right panel - Contact details
         detail_frame = tk.Frame(main_frame, bg='#f0f8ff')
@@ -87,6 +232,7 @@ class ContactBookApp:
         search_frame.pack(fill='x', pady=(0, 10))
         
         self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', self._schedule_search)
         search_entry = tk.Entry(
             search_frame, textvariable=self.search_var, font=('Arial', 12),
             bg=self.colors['entry_bg'], bd=2, relief='groove'
@@ -101,6 +247,14 @@ class ContactBookApp:
         )
         search_btn.pack(side='left')
         
+        self.fuzzy_var = tk.BooleanVar(value=False)
+        fuzzy_check = tk.Checkbutton(
+            search_frame, text="Fuzzy", variable=self.fuzzy_var,
+            bg='#f0f8ff', font=('Arial', 10),
+            command=self.search_contact
+        )
+        fuzzy_check.pack(side='left', padx=(5, 0))
+        
         # Contact details form
         form_frame = tk.LabelFrame(
             detail_frame, text="Contact Details",
@@ -132,7 +286,8 @@ class ContactBookApp:
             ('Add', self.add_contact, '#2e8b57'),
             ('Update', self.update_contact, '#4682b4'),
             ('Delete', self.delete_contact, '#cd5c5c'),
-            ('Clear', self.clear_form, '#d2691e')
+            ('Clear', self.clear_form, '#d2691e'),
+            ('Merge Duplicates', self.merge_duplicates, '#8a2be2')
         ]
         
         for text, command, color in buttons:
@@ -142,18 +297,37 @@ class ContactBookApp:
             )
             btn.pack(side='left', padx=5, ipadx=10, ipady=5)
         
+        io_frame = tk.Frame(detail_frame, bg='#f0f8ff')
+        io_frame.pack(fill='x', pady=(10, 0))
+        for text, command in (('Import...', self.import_contacts), ('Export...', self.export_contacts)):
+            tk.Button(
+                io_frame, text=text, bg=self.colors['button'], fg='white',
+                font=('Arial', 10, 'bold'), command=command
+            ).pack(side='left', padx=5, ipadx=10, ipady=5)
+        self.status_var = tk.StringVar()
+        tk.Label(
+            io_frame, textvariable=self.status_var, bg='#f0f8ff', font=('Arial', 10)
+        ).pack(side='left', padx=10)
+        
         # Initialize contact list
         self.update_contact_list()
     
-    def update_contact_list(self):
-        self.contact_list.delete(*self.contact_list.get_children())
-        for contact in self.contacts:
-            self.contact_list.insert('', 'end', values=(contact['name'], contact['phone']))
+    def _row_values(self, key):
+        # list rows only need the summary, which never loads contact details
+        return self.store.summary(key)
+    
+    def update_contact_list(self, keys=None, reset=False):
+        self.list_view.set_keys(self.store.keys() if keys is None else keys, reset)
     
-    def display_contact_details(self, event):
-        selected = self.contact_list.selection()
-        if selected:
-            contact = self.contacts[self.contact_list.index(selected[0])]
+    def _selected_key(self):
+        # the selected row may have been paged out of the Treeview
+        key = self.list_view.selected_key
+        return key if key in self.store else None
+    
+    def display_contact_details(self, event=None):
+        key = self._selected_key()
+        if key is not None:
+            contact = self.store.get(key)
             for field, var in self.entry_vars.items():
                 var.set(contact.get(field, ''))
     
@@ -162,66 +336,146 @@ class ContactBookApp:
         if not contact['name']:
             messagebox.showerror("Error", "Name is required!")
             return
+        if not self._confirm_not_duplicate(contact):
+            return
         
-        self.contacts.append(contact)
+        self.store.add(contact)
         self.save_contacts()
-        self.update_contact_list()
+        self.search_contact()
         self.clear_form()
         messagebox.showinfo("Success", "Contact added successfully!")
     
     def update_contact(self):
-        selected = self.contact_list.selection()
-        if not selected:
+        key = self._selected_key()
+        if key is None:
             messagebox.showerror("Error", "Please select a contact to update!")
             return
         
-        index = self.contact_list.index(selected[0])
         contact = {field: var.get().strip() for field, var in self.entry_vars.items()}
         if not contact['name']:
             messagebox.showerror("Error", "Name is required!")
             return
+        if not self._confirm_not_duplicate(contact, exclude=key):
+            return
         
-        self.contacts[index] = contact
+        self.store.update(key, contact)
         self.save_contacts()
-        self.update_contact_list()
+        self.search_contact()
         messagebox.showinfo("Success", "Contact updated successfully!")
     
     def delete_contact(self):
-        selected = self.contact_list.selection()
-        if not selected:
+        key = self._selected_key()
+        if key is None:
             messagebox.showerror("Error", "Please select a contact to delete!")
             return
         
         if messagebox.askyesno("Confirm", "Are you sure you want to delete this contact?"):
-            index = self.contact_list.index(selected[0])
-            del self.contacts[index]
+            self.store.delete(key)
             self.save_contacts()
-            self.update_contact_list()
+            self.search_contact()
             self.clear_form()
             messagebox.showinfo("Success", "Contact deleted successfully!")
     
+    def merge_duplicates(self):
+        groups = self.store.duplicate_groups()
+        if not groups:
+            messagebox.showinfo("Merge Duplicates", "No duplicate contacts found.")
+            return
+        total = sum(len(group) for group in groups)
+        if not messagebox.askyesno(
+            "Merge Duplicates",
+            f"Found {len(groups)} groups covering {total} contacts. Merge each group into one contact?"
+        ):
+            return
+        merged = self.store.merge_duplicates(groups)
+        self.save_contacts()
+        self.search_contact()
+        self.clear_form()
+        messagebox.showinfo("Success", f"Merged {merged} duplicate contacts.")
+    
+    def import_contacts(self):
+        if self.import_job is not None:
+            messagebox.showerror("Error", "An import is already running!")
+            return
+        filename = filedialog.askopenfilename(
+            title="Import Contacts",
+            filetypes=[("vCard", "*.vcf *.vcard"), ("CSV", "*.csv"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        self.import_job = import_contacts(self.store, filename)
+        self.import_progress = (0, 0)
+        self.status_var.set("Importing...")
+        self.root.after(1, self._import_step)
+    
+    def _import_step(self):
+        # one batch per callback keeps the window responsive during large imports
+        try:
+            self.import_progress = next(self.import_job)
+        except StopIteration:
+            self.import_job = None
+            self.save_contacts()
+            self.search_contact()
+            self.status_var.set("")
+            imported, skipped = self.import_progress
+            messagebox.showinfo("Success", f"Imported {imported} contacts ({skipped} skipped)!")
+            return
+        except (OSError, UnicodeDecodeError, ValueError, csv.Error) as e:
+            self.import_job = None
+            self.save_contacts()
+            self.search_contact()
+            self.status_var.set("")
+            messagebox.showerror("Error", f"Import failed:\n{e}")
+            return
+        self.status_var.set("Importing: {} added, {} skipped".format(*self.import_progress))
+        self.root.after(1, self._import_step)
+    
+    def export_contacts(self):
+        filename = filedialog.asksaveasfilename(
+            title="Export Contacts", defaultextension=".vcf",
+            filetypes=[("vCard", "*.vcf"), ("CSV", "*.csv")]
+        )
+        if not filename:
+            return
+        try:
+            count = export_contacts(self.store, filename)
+        except OSError as e:
+            messagebox.showerror("Error", f"Export failed:\n{e}")
+            return
+        messagebox.showinfo("Success", f"Exported {count} contacts!")
+    
+    def _schedule_search(self, *args):
+        # debounce typing so the list is filtered once the user pauses
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(SEARCH_DELAY_MS, self.search_contact)
+    
     def search_contact(self):
-        query = self.search_var.get().lower()
-        if not query:
-            self.update_contact_list()
+        self.search_job = None
+        query = self.search_var.get()
+        fuzzy = self.fuzzy_var.get()
+        # a new query starts at the top; refreshing the same one keeps the scroll position
+        reset = (query, fuzzy) != self.last_query
+        self.last_query = (query, fuzzy)
+        if not query.strip():
+            self.update_contact_list(reset=reset)
             return
         
-        results = [
-            contact for contact in self.contacts
-            if query in contact['name'].lower() or query in contact['phone'].lower()
-        ]
-        
-        self.contact_list.delete(*self.contact_list.get_children())
-        for contact in results:
-            self.contact_list.insert('', 'end', values=(contact['name'], contact['phone']))
+        if fuzzy:
+            # best matches first, closest spelling at the top
+            self.update_contact_list(self.store.fuzzy_search(query), reset)
+        else:
+            self.update_contact_list(self.store.search(query), reset)
     
     def clear_form(self):
+        # deselect too, so picking the same contact again reloads it
+        self.list_view.clear_selection()
         for var in self.entry_vars.values():
             var.set('')
 
 def main():
     root = tk.Tk()
-    app = ContactBookApp(root)
+    app = ContactBookApp(root, sys.argv[1] if len(sys.argv) > 1 else "contacts.json")
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,732 @@
+import argparse
+import csv
+import heapq
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+
+from background_writer import batched, write_json_atomic
+
+def load_contacts_file(filename):
+    if os.path.exists(filename):
+        with open(filename, 'r') as f:
+            try:
+                return json.load(f)
+            except json.JSONDecodeError:
+                return []
+    return []
+
+def save_contacts_file(filename, contacts):
+    write_json_atomic(filename, list(contacts), indent=2)
+
+COMPACT_MAGIC = b'CBK1'
+COMPACT_HEADER = struct.Struct('<4sIHH')  # magic, record count, name width, phone width
+NAME_WIDTH = 64
+PHONE_WIDTH = 24
+
+def _fixed(text, width):
+    # truncate to at most width bytes without splitting a UTF-8 sequence
+    return text.encode('utf-8')[:width].decode('utf-8', 'ignore').encode('utf-8')
+
+class CompactContactFile:
+    # a fixed-width index of (name, phone, payload offset, payload length) followed by
+    # one JSON payload per contact; the file is memory-mapped and payloads are only
+    # parsed when a contact's details are needed
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        self.map = None
+        self.count = 0
+        self.record = struct.Struct(f'<{NAME_WIDTH}s{PHONE_WIDTH}sQI')
+        self.name_width, self.phone_width = NAME_WIDTH, PHONE_WIDTH
+        if os.fstat(self.file.fileno()).st_size == 0:
+            return
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, name_width, phone_width = COMPACT_HEADER.unpack_from(self.map, 0)
+        if magic != COMPACT_MAGIC:
+            self.close()
+            raise ValueError(f"{filename} is not a compact contact file")
+        self.record = struct.Struct(f'<{name_width}s{phone_width}sQI')
+        self.name_width, self.phone_width = name_width, phone_width
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, i):
+        return self.record.unpack_from(self.map, COMPACT_HEADER.size + i * self.record.size)
+
+    def summary(self, i):
+        name, phone, _, _ = self._entry(i)
+        name, phone = name.rstrip(b'\0'), phone.rstrip(b'\0')
+        # a field filled to within one UTF-8 character of its width may have been
+        # cut short on write, so take it from the payload instead
+        if len(name) > self.name_width - 4 or len(phone) > self.phone_width - 4:
+            contact = self.contact(i)
+            return contact['name'], contact['phone']
+        return name.decode('utf-8'), phone.decode('utf-8')
+
+    def payload(self, i):
+        _, _, offset, length = self._entry(i)
+        return self.map[offset:offset + length]
+
+    def contact(self, i):
+        return json.loads(self.payload(i))
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+def write_compact_file(filename, count, records):
+    # records yields (name, phone, payload bytes); payloads are streamed after a
+    # reserved index area and the header and index are written last
+    record = struct.Struct(f'<{NAME_WIDTH}s{PHONE_WIDTH}sQI')
+    payload_start = COMPACT_HEADER.size + count * record.size
+    index = bytearray()
+    written = 0
+    tmp = filename + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.seek(payload_start)
+        offset = payload_start
+        for name, phone, payload in records:
+            if written == count:
+                break
+            f.write(payload)
+            index += record.pack(_fixed(name, NAME_WIDTH), _fixed(phone, PHONE_WIDTH), offset, len(payload))
+            offset += len(payload)
+            written += 1
+        f.seek(0)
+        f.write(COMPACT_HEADER.pack(COMPACT_MAGIC, written, NAME_WIDTH, PHONE_WIDTH))
+        f.write(index)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+    return written
+
+SEARCH_FIELDS = ('name', 'phone', 'email')
+FUZZY_LIMIT = 50
+# how many trigram candidates get an edit-distance check per requested result
+FUZZY_CANDIDATES = 20
+FUZZY_MIN_CANDIDATES = 500
+# contacts indexed per build_indexes() step when the build is spread out
+INDEX_BATCH = 500
+DEFAULT_COUNTRY_CODE = '91'
+
+def normalize_phone(phone):
+    # canonical digit form: "+91 78458-48776", "07845848776" and "7845848776" all match
+    digits = ''.join(ch for ch in str(phone or '') if ch.isdigit())
+    if digits.startswith('00'):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith('0'):
+        digits = digits[1:]
+    if len(digits) == 10:
+        digits = DEFAULT_COUNTRY_CODE + digits
+    return digits
+
+def normalize_email(email):
+    return str(email or '').strip().lower()
+
+def merge_contacts(contacts):
+    # the first contact wins; later ones only fill in its empty fields
+    merged = dict(contacts[0])
+    for contact in contacts[1:]:
+        for field, value in contact.items():
+            if value and not merged.get(field):
+                merged[field] = value
+    return merged
+
+class DuplicateIndex:
+    def __init__(self):
+        self.by_phone = {}  # normalized phone -> set of keys
+        self.by_email = {}  # normalized email -> set of keys
+        self.entries = {}   # key -> (phone, email) as indexed
+
+    def add(self, key, contact):
+        phone = normalize_phone(contact.get('phone'))
+        email = normalize_email(contact.get('email'))
+        self.entries[key] = (phone, email)
+        if phone:
+            self.by_phone.setdefault(phone, set()).add(key)
+        if email:
+            self.by_email.setdefault(email, set()).add(key)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for index, value in ((self.by_phone, entry[0]), (self.by_email, entry[1])):
+            keys = index.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[value]
+
+    def update(self, key, contact):
+        self.remove(key)
+        self.add(key, contact)
+
+    def find(self, contact, exclude=None):
+        keys = set()
+        phone = normalize_phone(contact.get('phone'))
+        email = normalize_email(contact.get('email'))
+        if phone:
+            keys |= self.by_phone.get(phone, set())
+        if email:
+            keys |= self.by_email.get(email, set())
+        keys.discard(exclude)
+        return sorted(keys)
+
+    def groups(self):
+        # union-find over keys sharing a phone or email; linear in the book size
+        parent = {}
+
+        def root(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for index in (self.by_phone, self.by_email):
+            for keys in index.values():
+                if len(keys) < 2:
+                    continue
+                for key in keys:
+                    parent.setdefault(key, key)
+                keys = iter(keys)
+                first = root(next(keys))
+                for key in keys:
+                    other = root(key)
+                    if other != first:
+                        parent[other] = first
+        groups = {}
+        for key in parent:
+            groups.setdefault(root(key), []).append(key)
+        return [sorted(group) for group in groups.values() if len(group) > 1]
+
+def normalize_text(value):
+    return ' '.join(str(value or '').lower().split())
+
+class ContactSearchIndex:
+    # trigram postings over normalized name, phone and email; a query's trigrams
+    # narrow the candidates and a substring check confirms each match
+    GRAM = 3
+
+    def __init__(self):
+        self.docs = {}   # key -> normalized searchable fields
+        self.grams = {}  # trigram -> set of keys
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _grams(self, fields):
+        grams = set()
+        for text in fields:
+            for i in range(len(text) - self.GRAM + 1):
+                grams.add(text[i:i + self.GRAM])
+        return grams
+
+    def add(self, key, contact):
+        fields = tuple(normalize_text(contact.get(field)) for field in SEARCH_FIELDS)
+        self.docs[key] = fields
+        for gram in self._grams(fields):
+            self.grams.setdefault(gram, set()).add(key)
+
+    def remove(self, key):
+        fields = self.docs.pop(key, None)
+        if fields is None:
+            return
+        for gram in self._grams(fields):
+            keys = self.grams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.grams[gram]
+
+    def update(self, key, contact):
+        self.remove(key)
+        self.add(key, contact)
+
+    def search(self, query):
+        query = normalize_text(query)
+        if not query:
+            return list(self.docs)
+        if len(query) < self.GRAM:
+            # too short for trigrams; scan the pre-normalized fields instead
+            candidates = self.docs
+        else:
+            postings = []
+            for gram in self._grams((query,)):
+                keys = self.grams.get(gram)
+                if not keys:
+                    return []
+                postings.append(keys)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for keys in postings[1:]:
+                candidates &= keys
+                if not candidates:
+                    return []
+        docs = self.docs
+        return sorted(key for key in candidates if any(query in text for text in docs[key]))
+
+    def fuzzy_search(self, query, limit=FUZZY_LIMIT, max_distance=None):
+        # rank contacts by edit distance to the query; shared trigrams pick a
+        # bounded set of candidates so the distance is not computed for everyone
+        query = normalize_text(query)
+        if len(query) < self.GRAM:
+            return self.search(query)[:limit]
+        if max_distance is None:
+            max_distance = max(1, len(query) // 4)
+        query_grams = self._grams((query,))
+        shared = {}
+        for gram in query_grams:
+            for key in self.grams.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+        # each edit breaks at most GRAM of the query's trigrams
+        needed = max(1, len(query_grams) - self.GRAM * max_distance)
+        candidates = heapq.nlargest(
+            max(limit * FUZZY_CANDIDATES, FUZZY_MIN_CANDIDATES),
+            ((count, key) for key, count in shared.items() if count >= needed)
+        )
+        ranked = []
+        for count, key in candidates:
+            distance = self._distance(query, self.docs[key], max_distance)
+            if distance <= max_distance:
+                ranked.append((distance, -count, key))
+        return [key for _, _, key in heapq.nsmallest(limit, ranked)]
+
+    def _distance(self, query, fields, limit):
+        if any(query in text for text in fields):
+            return 0
+        name, phone, email = fields
+        terms = name.split() + [name, phone, email.split('@')[0]]
+        best = limit + 1
+        for term in terms:
+            best = min(best, bounded_distance(query, term, best - 1))
+            if best == 1:
+                break
+        return best
+
+def bounded_distance(a, b, limit):
+    # Levenshtein distance, giving up with limit + 1 as soon as it must exceed limit
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char != other)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+CONTACT_FIELDS = ('name', 'phone', 'email', 'address')
+
+def normalize_contact(record):
+    if not isinstance(record, dict):
+        raise ValueError("Contact must be a set of fields")
+    contact = {field: ' '.join(str(record.get(field) or '').split()) for field in CONTACT_FIELDS}
+    if not contact['name']:
+        raise ValueError("Name is required")
+    return contact
+
+def iter_csv_contacts(f):
+    for row in csv.DictReader(f):
+        yield {(name or '').strip().lower(): value for name, value in row.items()}
+
+def iter_json_contacts(f):
+    # the legacy contacts.json layout is a single array, so it is parsed in one go
+    contacts = json.load(f)
+    if not isinstance(contacts, list):
+        raise ValueError("A JSON contact file must hold a list of contacts")
+    yield from contacts
+
+VCARD_ESCAPE = re.compile(r'\\(.)')
+
+def _vcard_unescape(value):
+    # one pass, so an escaped backslash is never taken as the start of another escape
+    return VCARD_ESCAPE.sub(lambda m: '\n' if m.group(1) in 'nN' else m.group(1), value)
+
+def _vcard_components(value):
+    # split a structured value such as N or ADR on its ; separators, leaving
+    # escaped \; inside a component alone
+    parts = []
+    current = []
+    chars = iter(value)
+    for char in chars:
+        if char == '\\':
+            current.append(char + next(chars, ''))
+        elif char == ';':
+            parts.append(_vcard_unescape(''.join(current)))
+            current = []
+        else:
+            current.append(char)
+    parts.append(_vcard_unescape(''.join(current)))
+    return parts
+
+def _vcard_escape(value):
+    return (value.replace('\\', '\\\\').replace(',', '\\,')
+            .replace(';', '\\;').replace('\n', '\\n'))
+
+def _vcard_lines(f):
+    # undo RFC 6350 line folding: a line starting with a space continues the previous one
+    pending = None
+    for line in f:
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending is not None:
+        yield pending
+
+def iter_vcards(f):
+    card = None
+    for line in _vcard_lines(f):
+        if ':' not in line:
+            continue
+        prop, value = line.split(':', 1)
+        name = prop.split(';', 1)[0].split('.')[-1].upper()
+        if name == 'BEGIN' and value.strip().upper() == 'VCARD':
+            card = {}
+        elif name == 'END' and card is not None:
+            yield card
+            card = None
+        elif card is None:
+            continue
+        elif name == 'FN':
+            card['name'] = _vcard_unescape(value)
+        elif name == 'N' and not card.get('name'):
+            parts = _vcard_components(value)
+            card['name'] = ' '.join(p for p in parts[1:2] + parts[:1] if p)
+        elif name == 'TEL' and not card.get('phone'):
+            card['phone'] = value
+        elif name == 'EMAIL' and not card.get('email'):
+            card['email'] = value
+        elif name == 'ADR' and not card.get('address'):
+            parts = _vcard_components(value)
+            card['address'] = ', '.join(p for p in parts if p)
+
+def write_csv_contacts(f, contacts):
+    writer = csv.DictWriter(f, fieldnames=CONTACT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for contact in contacts:
+        writer.writerow(contact)
+        count += 1
+    return count
+
+def write_vcards(f, contacts):
+    count = 0
+    for contact in contacts:
+        lines = ['BEGIN:VCARD', 'VERSION:3.0',
+                 f"FN:{_vcard_escape(contact.get('name', ''))}",
+                 f"N:;{_vcard_escape(contact.get('name', ''))};;;"]
+        if contact.get('phone'):
+            lines.append(f"TEL:{contact['phone']}")
+        if contact.get('email'):
+            lines.append(f"EMAIL:{contact['email']}")
+        if contact.get('address'):
+            lines.append(f"ADR:;;{_vcard_escape(contact['address'])};;;;")
+        lines.append('END:VCARD')
+        f.write('\r\n'.join(lines) + '\r\n')
+        count += 1
+    return count
+
+def _is_vcard(filename):
+    return filename.lower().endswith(('.vcf', '.vcard'))
+
+def import_contacts(store, filename, batch_size=2000, skip_duplicates=True):
+    # generator: parses lazily and yields (imported, skipped) after every batch so a
+    # GUI can keep its event loop running; the caller saves the store once at the end
+    if _is_vcard(filename):
+        reader = iter_vcards
+    elif filename.lower().endswith('.json'):
+        reader = iter_json_contacts
+    else:
+        reader = iter_csv_contacts
+    imported = skipped = 0
+    with open(filename, 'r', newline='', encoding='utf-8-sig') as f:
+        for batch in batched(reader(f), batch_size):
+            valid = []
+            for record in batch:
+                try:
+                    contact = normalize_contact(record)
+                except ValueError:
+                    skipped += 1
+                    continue
+                if skip_duplicates and store.find_duplicates(contact):
+                    skipped += 1
+                    continue
+                valid.append(contact)
+                if skip_duplicates:
+                    # add one at a time so later records in the batch see this one
+                    store.add(contact)
+            if not skip_duplicates:
+                store.add_many(valid)
+            imported += len(valid)
+            yield imported, skipped
+
+def export_contacts(store, filename):
+    contacts = store.iter_contacts()
+    if filename.lower().endswith('.json'):
+        contacts = list(contacts)
+        save_contacts_file(filename, contacts)
+        return len(contacts)
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        if _is_vcard(filename):
+            return write_vcards(f, contacts)
+        return write_csv_contacts(f, contacts)
+
+def is_compact_file(filename):
+    return filename.lower().endswith('.cbk')
+
+class ContactStore:
+    # headless contact book: each contact gets a key that stays valid for the
+    # life of the store, so views and scripts never address contacts by position.
+    # With a .cbk file only the name/phone index is read at startup; details are
+    # parsed from the memory map on first access. The search and duplicate
+    # indexes can be built a step at a time with build_indexes(), and are
+    # finished on the spot if they are needed before that.
+    def __init__(self, filename="contacts.json", writer=None):
+        self.filename = filename
+        self.writer = writer
+        self.source = None
+        # guards self.source, which a save swaps for the newly written file
+        self._lock = threading.RLock()
+        self.load()
+
+    def __len__(self):
+        return len(self.contacts)
+
+    def __iter__(self):
+        return iter(self.contacts)
+
+    def __contains__(self, key):
+        return key in self.contacts
+
+    def load(self):
+        self.close()
+        self.contacts = {}  # key -> contact, or None while it is still on disk
+        self.lazy = {}      # key -> record number in self.source
+        self.next_key = 0
+        self.search_index = None
+        self.duplicate_index = None
+        self._unindexed = []  # keys the indexes have yet to take in
+        if is_compact_file(self.filename):
+            if os.path.exists(self.filename):
+                self.source = CompactContactFile(self.filename)
+                for i in range(len(self.source)):
+                    key = self._new_key()
+                    self.contacts[key] = None
+                    self.lazy[key] = i
+        else:
+            for contact in load_contacts_file(self.filename):
+                self.add(contact)
+
+    def close(self):
+        with self._lock:
+            if self.source is not None:
+                self.source.close()
+                self.source = None
+
+    def _new_key(self):
+        key = self.next_key
+        self.next_key += 1
+        return key
+
+    def build_indexes(self, limit=None):
+        # indexes up to `limit` more contacts, all of them when None, and
+        # returns True once the indexes are complete. Changes made between
+        # steps go straight into the indexes; contacts not reached yet are
+        # indexed as they are when their turn comes.
+        if self.search_index is None:
+            self.search_index = ContactSearchIndex()
+            self.duplicate_index = DuplicateIndex()
+            # popped from the end, so reversed to index in book order
+            self._unindexed = list(self.contacts)[::-1]
+        pending = self._unindexed
+        stop = 0 if limit is None else max(0, len(pending) - limit)
+        while len(pending) > stop:
+            key = pending.pop()
+            contact = self.peek(key)
+            if contact is not None:
+                self.search_index.add(key, contact)
+                self.duplicate_index.add(key, contact)
+        return not pending
+
+    def indexed_count(self):
+        if self.search_index is None:
+            return 0
+        return len(self.contacts) - len(self._unindexed)
+
+    def _ensure_indexes(self):
+        if self.search_index is None or self._unindexed:
+            self.build_indexes()
+
+    def save(self):
+        if self.writer is not None:
+            # bursts of changes collapse into one write on the writer thread
+            self.writer.schedule(self.filename, self._write)
+        else:
+            self._write()
+
+    def _write(self):
+        if is_compact_file(self.filename):
+            with self._lock:
+                items = list(self.contacts.items())
+                lazy = dict(self.lazy)
+            written = []
+            tmp = self.filename + '.new'
+            # untouched payloads are read from the current file while the new one
+            # is written beside it; it can only be replaced once it is unmapped,
+            # as Windows refuses to replace a file that is open
+            write_compact_file(tmp, len(items), self._compact_records(items, lazy, written))
+            with self._lock:
+                reopen = self.source is not None
+                if reopen:
+                    self.source.close()
+                    self.source = None
+                try:
+                    os.replace(tmp, self.filename)
+                except OSError:
+                    if reopen:
+                        # the old file is still in place; keep reading from it
+                        self.source = CompactContactFile(self.filename)
+                    raise
+                self.source = CompactContactFile(self.filename)
+                # contacts still untouched are now read from the new file
+                self.lazy = {key: i for i, key in enumerate(written) if key in self.lazy}
+        else:
+            save_contacts_file(self.filename, self.iter_contacts())
+
+    def _compact_records(self, items, lazy, written):
+        for key, contact in items:
+            if contact is None and key in lazy:
+                # untouched contacts are copied straight from the old file
+                name, phone = self.source.summary(lazy[key])
+                payload = self.source.payload(lazy[key])
+            else:
+                contact = contact or self.contacts.get(key)
+                if contact is None:
+                    continue
+                name, phone = contact.get('name', ''), contact.get('phone', '')
+                payload = json.dumps(contact, ensure_ascii=False).encode('utf-8')
+            written.append(key)
+            yield name, phone, payload
+
+    def keys(self):
+        return list(self.contacts)
+
+    def get(self, key):
+        with self._lock:
+            contact = self.contacts.get(key)
+            if contact is None and key in self.lazy:
+                contact = self.source.contact(self.lazy[key])
+                self.contacts[key] = contact
+                del self.lazy[key]
+            return contact
+
+    def peek(self, key):
+        # like get(), but does not keep a lazily loaded contact in memory
+        with self._lock:
+            contact = self.contacts.get(key)
+            if contact is None and key in self.lazy:
+                return self.source.contact(self.lazy[key])
+            return contact
+
+    def summary(self, key):
+        with self._lock:
+            if key in self.lazy:
+                return self.source.summary(self.lazy[key])
+            contact = self.contacts[key]
+            return contact['name'], contact['phone']
+
+    def iter_contacts(self):
+        for key in list(self.contacts):
+            contact = self.peek(key)
+            if contact is not None:
+                yield contact
+
+    def add(self, contact):
+        key = self._new_key()
+        with self._lock:
+            self.contacts[key] = contact
+        if self.search_index is not None:
+            self.search_index.add(key, contact)
+            self.duplicate_index.add(key, contact)
+        return key
+
+    def add_many(self, contacts):
+        return [self.add(contact) for contact in contacts]
+
+    def update(self, key, contact):
+        if key not in self.contacts:
+            raise KeyError(key)
+        with self._lock:
+            self.contacts[key] = contact
+            self.lazy.pop(key, None)
+        if self.search_index is not None:
+            self.search_index.update(key, contact)
+            self.duplicate_index.update(key, contact)
+
+    def delete(self, key):
+        with self._lock:
+            del self.contacts[key]
+            self.lazy.pop(key, None)
+        if self.search_index is not None:
+            self.search_index.remove(key)
+            self.duplicate_index.remove(key)
+
+    def search(self, query):
+        self._ensure_indexes()
+        return self.search_index.search(query)
+
+    def fuzzy_search(self, query, limit=FUZZY_LIMIT):
+        self._ensure_indexes()
+        return self.search_index.fuzzy_search(query, limit)
+
+    def find_duplicates(self, contact, exclude=None):
+        self._ensure_indexes()
+        return self.duplicate_index.find(contact, exclude)
+
+    def duplicate_groups(self):
+        self._ensure_indexes()
+        return self.duplicate_index.groups()
+
+    def merge_duplicates(self, groups=None):
+        merged = 0
+        for group in self.duplicate_groups() if groups is None else groups:
+            self.update(group[0], merge_contacts([self.get(key) for key in group]))
+            for key in group[1:]:
+                self.delete(key)
+                merged += 1
+        return merged
+
+def convert_contacts(source, target):
+    # copy a contact book between the JSON and compact (.cbk) formats
+    store = ContactStore(source)
+    try:
+        store.filename = target
+        store.save()
+        return len(store)
+    finally:
+        store.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a contact book between formats")
+    parser.add_argument("source", help="contacts.json or a .cbk compact file")
+    parser.add_argument("target", help="file to write; .cbk selects the compact format")
+    args = parser.parse_args()
+    count = convert_contacts(args.source, args.target)
+    print(f"Wrote {count} contacts to {args.target}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import math
+import os
+import string
+import sys
+from itertools import combinations
+from multiprocessing import Pool
+
+# limited to common typable symbols to avoid weird clipboard issues
+SAFE_SYMBOLS = "!@#$%^&*()-_=+[]{};:,.<>?/~"
+CHARACTER_CLASSES = (
+    ('upper', string.ascii_uppercase),
+    ('lower', string.ascii_lowercase),
+    ('digits', string.digits),
+    ('symbols', SAFE_SYMBOLS),
+)
+BUFFER_SIZE = 64 * 1024
+CHUNK_SIZE = 10000
+
+class PasswordPolicy:
+    # everything that depends only on the settings is worked out once here,
+    # so generating a password is a slice of a pre-translated random buffer
+    def __init__(self, length=12, upper=True, lower=True, digits=True, symbols=True):
+        selected = {'upper': upper, 'lower': lower, 'digits': digits, 'symbols': symbols}
+        self.length = length
+        self.classes = tuple(chars for name, chars in CHARACTER_CLASSES if selected[name])
+        if not self.classes:
+            raise ValueError("Please select at least one character type!")
+        if length < len(self.classes):
+            raise ValueError(f"Password length must be at least {len(self.classes)} "
+                             "to include every selected character type")
+        self.alphabet = ''.join(self.classes)
+        size = len(self.alphabet)
+        # bytes at or above the largest multiple of the alphabet size are thrown
+        # away, so every character is equally likely
+        limit = 256 - 256 % size
+        self.reject = bytes(range(limit, 256))
+        self.table = bytes(ord(self.alphabet[b % size]) for b in range(256))
+        # maps each character to the number of its class, for the coverage check
+        marks = bytearray(256)
+        for number, chars in enumerate(self.classes):
+            for char in chars.encode('ascii'):
+                marks[char] = number
+        self.class_table = bytes(marks)
+
+    def settings(self):
+        return (self.length,) + tuple(chars in self.classes for _, chars in CHARACTER_CLASSES)
+
+    def accepts(self, candidate):
+        # a password missing a selected class is redrawn whole rather than
+        # patched, which would make some positions predictable
+        return len(set(candidate.translate(self.class_table))) == len(self.classes)
+
+    def fits(self, password):
+        # could this password have been drawn from the policy?
+        try:
+            candidate = password.encode('ascii')
+        except UnicodeEncodeError:
+            return False
+        return (len(candidate) == self.length
+                and not candidate.translate(None, self.alphabet.encode('ascii'))
+                and self.accepts(candidate))
+
+    def entropy(self):
+        # bits in a uniform choice among passwords that use every selected class,
+        # counted by inclusion-exclusion over the classes that could be missing
+        sizes = [len(chars) for chars in self.classes]
+        total = sum(sizes)
+        valid = 0
+        for missing in range(len(sizes)):
+            for dropped in combinations(sizes, missing):
+                valid += (-1) ** missing * (total - sum(dropped)) ** self.length
+        return math.log2(valid)
+
+class PasswordGenerator:
+    def __init__(self, policy, buffer_size=BUFFER_SIZE):
+        self.policy = policy
+        self.buffer_size = buffer_size
+        self._buffer = b''
+        self._pos = 0
+
+    def _refill(self):
+        fresh = os.urandom(self.buffer_size).translate(self.policy.table, self.policy.reject)
+        self._buffer = self._buffer[self._pos:] + fresh
+        self._pos = 0
+
+    def generate_bytes(self):
+        length = self.policy.length
+        while True:
+            if len(self._buffer) - self._pos < length:
+                self._refill()
+                continue
+            candidate = self._buffer[self._pos:self._pos + length]
+            self._pos += length
+            if self.policy.accepts(candidate):
+                return candidate
+
+    def generate(self):
+        return self.generate_bytes().decode('ascii')
+
+    def generate_many(self, count):
+        for _ in range(count):
+            yield self.generate()
+
+def _generate_chunk(job):
+    settings, count = job
+    generator = PasswordGenerator(PasswordPolicy(*settings))
+    return b''.join(generator.generate_bytes() + b'\n' for _ in range(count))
+
+def _chunks(count, size):
+    while count > 0:
+        yield min(size, count)
+        count -= size
+
+def write_passwords(policy, count, out, workers=1, chunk_size=CHUNK_SIZE):
+    # out is a binary stream; chunks are written in order as they complete
+    jobs = ((policy.settings(), n) for n in _chunks(count, chunk_size))
+    if workers > 1:
+        with Pool(workers) as pool:
+            for block in pool.imap(_generate_chunk, jobs):
+                out.write(block)
+    else:
+        for job in jobs:
+            out.write(_generate_chunk(job))
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate passwords in bulk, one per line.")
+    parser.add_argument("-n", "--count", type=int, default=1, help="number of passwords (default: %(default)s)")
+    parser.add_argument("-l", "--length", type=int, default=12, help="password length (default: %(default)s)")
+    parser.add_argument("-o", "--output", help="write to this file instead of stdout")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes to split the work across (default: %(default)s)")
+    for name, chars in CHARACTER_CLASSES:
+        parser.add_argument(f"--no-{name}", dest=name, action="store_false",
+                            help=f"leave out {name} characters")
+    args = parser.parse_args()
+
+    try:
+        policy = PasswordPolicy(args.length, args.upper, args.lower, args.digits, args.symbols)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.count < 0:
+        parser.error("count must not be negative")
+
+    if args.output:
+        with open(args.output, 'wb') as out:
+            write_passwords(policy, args.count, out, args.workers)
+    else:
+        write_passwords(policy, args.count, sys.stdout.buffer, args.workers)
+        sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
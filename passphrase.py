@@ -0,0 +1,171 @@
+import argparse
+import math
+import mmap
+import os
+import secrets
+import struct
+
+WORDLIST_MAGIC = b'WRD1'
+WORDLIST_HEADER = struct.Struct('<4sI')  # magic, word count
+OFFSET = struct.Struct('<I')
+DEFAULT_WORDLIST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "words.idx")
+SEPARATORS = ('-', ' ', '.', '_')
+CAPITALIZATIONS = ('lower', 'title', 'upper')
+
+def build_wordlist(source, filename):
+    # words are lowercased, de-duplicated and sorted so a phrase can be checked
+    # against the list by binary search; words containing a separator are dropped
+    # so phrases always split back into the words they were made of
+    words = set()
+    with open(source, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            fields = line.split()
+            # Diceware lists put the dice roll in front of each word
+            word = fields[-1].lower() if fields else ''
+            if word and not any(sep in word for sep in SEPARATORS):
+                words.add(word.encode('utf-8'))
+    words = sorted(words)
+    tmp = filename + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(WORDLIST_HEADER.pack(WORDLIST_MAGIC, len(words)))
+        offset = 0
+        offsets = bytearray()
+        for word in words:
+            offsets += OFFSET.pack(offset)
+            offset += len(word)
+        offsets += OFFSET.pack(offset)
+        f.write(offsets)
+        for word in words:
+            f.write(word)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+    return len(words)
+
+class WordList:
+    # a header, count + 1 offsets and the concatenated words; the file is
+    # memory-mapped and only the words actually picked are decoded
+    def __init__(self, filename=DEFAULT_WORDLIST_FILE):
+        self.file = open(filename, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"{filename} is not a word list file")
+        if len(self.map) < WORDLIST_HEADER.size:
+            self.close()
+            raise ValueError(f"{filename} is not a word list file")
+        magic, self.count = WORDLIST_HEADER.unpack_from(self.map, 0)
+        if magic != WORDLIST_MAGIC or self.count == 0:
+            self.close()
+            raise ValueError(f"{filename} is not a word list file")
+        self.blob = WORDLIST_HEADER.size + (self.count + 1) * OFFSET.size
+        if (len(self.map) < self.blob or
+                self.blob + OFFSET.unpack_from(self.map, self.blob - OFFSET.size)[0] > len(self.map)):
+            self.close()
+            raise ValueError(f"{filename} is truncated")
+
+    def __len__(self):
+        return self.count
+
+    def _word_bytes(self, i):
+        start, end = struct.unpack_from('<II', self.map, WORDLIST_HEADER.size + i * OFFSET.size)
+        return self.map[self.blob + start:self.blob + end]
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError("word index out of range")
+        return self._word_bytes(i).decode('utf-8')
+
+    def __contains__(self, word):
+        target = word.lower().encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self._word_bytes(mid) < target:
+                low = mid + 1
+            else:
+                high = mid
+        return low < self.count and self._word_bytes(low) == target
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+class PassphrasePolicy:
+    def __init__(self, wordlist, words=6, separator='-', capitalization='lower'):
+        if words < 1:
+            raise ValueError("Word count must be at least 1")
+        if separator not in SEPARATORS:
+            raise ValueError(f"Separator must be one of {SEPARATORS}")
+        if capitalization not in CAPITALIZATIONS:
+            raise ValueError(f"Capitalization must be one of {CAPITALIZATIONS}")
+        self.wordlist = wordlist
+        self.words = words
+        self.separator = separator
+        self.capitalization = capitalization
+
+    def settings(self):
+        return (self.words, self.separator, self.capitalization)
+
+    def format(self, word):
+        if self.capitalization == 'title':
+            return word.capitalize()
+        if self.capitalization == 'upper':
+            return word.upper()
+        return word
+
+    def fits(self, password):
+        parts = password.split(self.separator)
+        return (len(parts) == self.words
+                and all(self.format(part.lower()) == part and part in self.wordlist for part in parts))
+
+    def entropy(self):
+        return self.words * math.log2(len(self.wordlist))
+
+class PassphraseGenerator:
+    def __init__(self, policy):
+        self.policy = policy
+
+    def generate(self):
+        wordlist = self.policy.wordlist
+        words = [self.policy.format(wordlist[secrets.randbelow(len(wordlist))])
+                 for _ in range(self.policy.words)]
+        return self.policy.separator.join(words)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a passphrase word list or generate Diceware-style passphrases.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="index a word list (one word per line, dice numbers allowed)")
+    build.add_argument("source")
+    build.add_argument("output", nargs="?", default=DEFAULT_WORDLIST_FILE,
+                       help="index file to write (default: %(default)s)")
+    generate = commands.add_parser("generate", help="print passphrases")
+    generate.add_argument("-n", "--count", type=int, default=1, help="number of passphrases (default: %(default)s)")
+    generate.add_argument("-w", "--words", type=int, default=6, help="words per passphrase (default: %(default)s)")
+    generate.add_argument("-s", "--separator", default='-', choices=SEPARATORS)
+    generate.add_argument("-c", "--capitalization", default='lower', choices=CAPITALIZATIONS)
+    generate.add_argument("--wordlist", default=DEFAULT_WORDLIST_FILE, help="index file (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_wordlist(args.source, args.output)
+        print(f"Wrote {count} words to {args.output}")
+        return
+
+    try:
+        wordlist = WordList(args.wordlist)
+        policy = PassphrasePolicy(wordlist, args.words, args.separator, args.capitalization)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    try:
+        generator = PassphraseGenerator(policy)
+        for _ in range(args.count):
+            print(generator.generate())
+    finally:
+        wordlist.close()
+
+if __name__ == "__main__":
+    main()
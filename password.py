@@ -1,14 +1,31 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import random
-import string
+
+from passgen import PasswordGenerator, PasswordPolicy
+from passphrase import CAPITALIZATIONS, PassphraseGenerator, PassphrasePolicy, WordList
+from strength import open_default_meter
+
+STRENGTH_COLORS = {
+    "Very weak": '#e74c3c',
+    "Weak": '#e67e22',
+    "Fair": '#f1c40f',
+    "Strong": '#2ecc71',
+    "Very strong": '#1abc9c',
+}
+
+SEPARATOR_LABELS = {
+    "Hyphen (-)": '-',
+    "Space": ' ',
+    "Period (.)": '.',
+    "Underscore (_)": '_',
+}
 
 class PasswordGeneratorApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Colorful Password Generator")
-        self.root.geometry("500x480")
+        self.root.geometry("500x560")
         self.root.configure(bg='#2c3e50')
 
         # Use consistent vars
@@ -18,8 +35,18 @@ class PasswordGeneratorApp:
         self.digits_var = tk.BooleanVar(value=True)
         self.symbols_var = tk.BooleanVar(value=True)
         self.password_var = tk.StringVar()
+        self.mode_var = tk.StringVar(value='characters')
+        self.words_var = tk.IntVar(value=6)
+        self.separator_var = tk.StringVar(value="Hyphen (-)")
+        self.capitalization_var = tk.StringVar(value='lower')
+        # rebuilt only when the settings change
+        self.generator = None
+        # opened on the first passphrase
+        self.wordlist = None
+        self.meter = open_default_meter()
 
         self.create_widgets()
+        self.password_var.trace_add('write', self.update_strength)
 
     def create_widgets(self):
         # Header
@@ -46,7 +73,15 @@ class PasswordGeneratorApp:
         # keep display in sync
         self.length_var.trace_add('write', lambda *_: self.length_display.config(text=str(self.length_var.get())))
 
-        # Character options (checkboxes)
+        # Mode: random characters or a passphrase of dictionary words
+        modes = tk.Frame(main, bg='#2c3e50')
+        modes.pack(pady=(6,0), anchor='w')
+        for text, value in (("Characters", 'characters'), ("Passphrase", 'passphrase')):
+            tk.Radiobutton(modes, text=text, variable=self.mode_var, value=value,
+                           font=('Arial',10,'bold'), bg='#2c3e50', fg='#ecf0f1',
+                           selectcolor='#2c3e50', activebackground='#2c3e50').pack(side='left', padx=(0,12))
+
+        # Character options (checkboxes) and passphrase options side by side
         opts = tk.Frame(main, bg='#2c3e50')
         opts.pack(pady=10, anchor='w')
         tk.Checkbutton(opts, text="Uppercase (A-Z)", variable=self.upper_var,
@@ -62,6 +97,19 @@ class PasswordGeneratorApp:
                        font=('Arial',10), bg='#2c3e50', fg='#ecf0f1',
                        selectcolor='#2c3e50', activebackground='#2c3e50').grid(row=3, column=0, sticky='w')
 
+        phrase_opts = [
+            ("Words:", tk.Spinbox(opts, from_=3, to=12, textvariable=self.words_var,
+                                  width=5, state='readonly')),
+            ("Separator:", ttk.Combobox(opts, textvariable=self.separator_var, width=14,
+                                        values=list(SEPARATOR_LABELS), state='readonly')),
+            ("Case:", ttk.Combobox(opts, textvariable=self.capitalization_var, width=14,
+                                   values=CAPITALIZATIONS, state='readonly')),
+        ]
+        for row, (text, widget) in enumerate(phrase_opts):
+            tk.Label(opts, text=text, font=('Arial',10), bg='#2c3e50',
+                     fg='#ecf0f1').grid(row=row, column=1, sticky='w', padx=(30,6))
+            widget.grid(row=row, column=2, sticky='w')
+
         # Generate button
         gen_btn = tk.Button(main, text="Generate Password", font=('Arial', 12, 'bold'),
                             bg='#3498db', fg='white', bd=0, padx=10, pady=8,
@@ -73,53 +121,60 @@ class PasswordGeneratorApp:
                                   bd=0, relief='flat', bg='#34495e', fg='#2ecc71', justify='center')
         password_entry.pack(fill='x', ipady=10, padx=10)
 
+        # Strength meter, kept in sync with the password as it is generated or typed
+        self.strength_label = tk.Label(main, text="", font=('Arial', 11, 'bold'),
+                                       bg='#2c3e50', fg='#ecf0f1')
+        self.strength_label.pack(pady=(6,0))
+
         # Copy button
         copy_btn = tk.Button(main, text="Copy to Clipboard", font=('Arial', 11),
                              bg='#2ecc71', fg='black', bd=0, padx=8, pady=6,
                              command=self.copy_to_clipboard)
         copy_btn.pack(pady=10)
 
+    def _get_generator(self):
+        if self.mode_var.get() == 'passphrase':
+            if self.wordlist is None:
+                self.wordlist = WordList()
+            settings = (int(self.words_var.get()), SEPARATOR_LABELS[self.separator_var.get()],
+                        self.capitalization_var.get())
+            if (not isinstance(self.generator, PassphraseGenerator)
+                    or self.generator.policy.settings() != settings):
+                self.generator = PassphraseGenerator(PassphrasePolicy(self.wordlist, *settings))
+            return self.generator
+        settings = (int(self.length_var.get()), self.upper_var.get(), self.lower_var.get(),
+                    self.digits_var.get(), self.symbols_var.get())
+        if (not isinstance(self.generator, PasswordGenerator)
+                or self.generator.policy.settings() != settings):
+            self.generator = PasswordGenerator(PasswordPolicy(*settings), buffer_size=4096)
+        return self.generator
+
     def generate_password(self):
         try:
-            length = int(self.length_var.get())
-            chars = ''
-            if self.upper_var.get():
-                chars += string.ascii_uppercase
-            if self.lower_var.get():
-                chars += string.ascii_lowercase
-            if self.digits_var.get():
-                chars += string.digits
-            if self.symbols_var.get():
-                # Limit punctuation to common typable symbols to avoid weird clipboard issues
-                safe_symbols = "!@#$%^&*()-_=+[]{};:,.<>?/~"
-                chars += safe_symbols
-
-            if not chars:
-                messagebox.showerror("Error", "Please select at least one character type!")
-                return
-
-            # Guarantee at least one char of each selected type (optional — more secure)
-            password_chars = []
-            if self.upper_var.get():
-                password_chars.append(random.choice(string.ascii_uppercase))
-            if self.lower_var.get():
-                password_chars.append(random.choice(string.ascii_lowercase))
-            if self.digits_var.get():
-                password_chars.append(random.choice(string.digits))
-            if self.symbols_var.get():
-                password_chars.append(random.choice(safe_symbols))
-
-            # Fill the rest
-            remaining = length - len(password_chars)
-            if remaining > 0:
-                password_chars += [random.choice(chars) for _ in range(remaining)]
-
-            random.shuffle(password_chars)
-            password = ''.join(password_chars[:length])
-            self.password_var.set(password)
+            generator = self._get_generator()
+        except OSError:
+            messagebox.showerror("Error", "Passphrase word list not found!\n"
+                                 "Build it with: python passphrase.py build <wordlist.txt>")
+            return
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        try:
+            self.password_var.set(generator.generate())
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate password:\n{e}")
 
+    def update_strength(self, *args):
+        policy = self.generator.policy if self.generator is not None else None
+        bits, label, breached = self.meter.check(self.password_var.get(), policy)
+        if not label:
+            self.strength_label.config(text="")
+        elif breached:
+            self.strength_label.config(text="Found in breached password list!", fg='#e74c3c')
+        else:
+            self.strength_label.config(text=f"Strength: {label} ({bits:.0f} bits)",
+                                       fg=STRENGTH_COLORS[label])
+
     def copy_to_clipboard(self):
         pwd = self.password_var.get()
         if pwd:
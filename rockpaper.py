@@ -3,6 +3,15 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import random
 
+from rps_engine import MOVES, RandomStrategy, outcome
+from rpsbot import AdaptiveOpponent
+
+RESULTS = {
+    1: ("You Win!", '#2ecc71'),
+    0: ("It's a Tie!", '#f1c40f'),
+    -1: ("Computer Wins!", '#e74c3c'),
+}
+
 class RockPaperScissorsGame:
     def __init__(self, root):  # ✅ fixed double underscores
         self.root = root
@@ -13,7 +22,11 @@ class RockPaperScissorsGame:
         # Game variables
         self.user_score = 0
         self.computer_score = 0
-        self.choices = ["Rock", "Paper", "Scissors"]
+        self.choices = list(MOVES)
+        self.random_opponent = RandomStrategy(random.Random())
+        # learns from every round, but only picks the moves when enabled
+        self.opponent = AdaptiveOpponent()
+        self.adaptive_var = tk.BooleanVar(value=False)
         
         # Custom styles
         self.style = ttk.Style()
@@ -63,6 +76,11 @@ class RockPaperScissorsGame:
             self.style.configure(f'{choice}.TButton', background=button_colors[choice])
             btn['style'] = f'{choice}.TButton'
         
+        tk.Checkbutton(self.root, text="Adaptive opponent (learns your patterns)",
+                       variable=self.adaptive_var, font=('Arial', 11),
+                       bg='#2c3e50', fg='#ecf0f1', selectcolor='#2c3e50',
+                       activebackground='#2c3e50').pack()
+        
         # Result display
         result_frame = tk.Frame(self.root, bg='#34495e', bd=2, relief='groove')
         result_frame.pack(pady=20, padx=30, fill='both', expand=True)
@@ -88,25 +106,22 @@ class RockPaperScissorsGame:
         reset_btn.pack(pady=10)
     
     def play_round(self, user_choice):
-        computer_choice = random.choice(self.choices)
+        user_move = self.choices.index(user_choice)
+        opponent = self.opponent if self.adaptive_var.get() else self.random_opponent
+        computer_move = opponent.choose()
+        self.opponent.observe(user_move)
+        computer_choice = self.choices[computer_move]
         
         # Update display
         self.user_choice_label.config(text=user_choice)
         self.computer_choice_label.config(text=computer_choice)
         
-        # Determine winner
-        if user_choice == computer_choice:
-            result = "It's a Tie!"
-            color = '#f1c40f'
-        elif (user_choice == "Rock" and computer_choice == "Scissors") or \
-             (user_choice == "Paper" and computer_choice == "Rock") or \
-             (user_choice == "Scissors" and computer_choice == "Paper"):
-            result = "You Win!"
-            color = '#2ecc71'
+        # Determine winner from the payoff table
+        score = outcome(user_move, computer_move)
+        result, color = RESULTS[score]
+        if score > 0:
             self.user_score += 1
-        else:
-            result = "Computer Wins!"
-            color = '#e74c3c'
+        elif score < 0:
             self.computer_score += 1
         
         # Update UI
@@ -117,6 +132,7 @@ class RockPaperScissorsGame:
     def reset_game(self):
         self.user_score = 0
         self.computer_score = 0
+        self.opponent = AdaptiveOpponent()
         self.user_score_label.config(text="0")
         self.computer_score_label.config(text="0")
         self.user_choice_label.config(text="")
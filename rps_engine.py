@@ -0,0 +1,238 @@
+import argparse
+import json
+import operator
+import random
+from array import array
+from collections import Counter
+from itertools import combinations
+from multiprocessing import Pool
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from rpsbot import MOVES, AdaptiveOpponent, beats
+
+# PAYOFF[a * 3 + b] is the result for the player of a against b:
+# 1 win, 0 tie, -1 loss
+PAYOFF = tuple(1 if a == beats(b) else -1 if b == beats(a) else 0
+               for a in range(3) for b in range(3))
+CHUNK_ROUNDS = 65536
+
+def outcome(a, b):
+    return PAYOFF[a * 3 + b]
+
+def _as_moves(moves):
+    if isinstance(moves, (bytes, bytearray, array)):
+        return np.frombuffer(moves, dtype=np.uint8)
+    return np.asarray(moves, dtype=np.uint8)
+
+def score_batch(moves_a, moves_b):
+    # (wins, ties, losses) for side a over paired sequences of moves, by
+    # looking every pair up in the payoff table at once
+    if np is not None:
+        pairs = np.bincount(_as_moves(moves_a).astype(np.intp) * 3 + _as_moves(moves_b), minlength=9)
+    else:
+        counted = Counter(map(operator.add, map((3).__mul__, moves_a), moves_b))
+        pairs = [counted[i] for i in range(9)]
+    wins = ties = losses = 0
+    for index, count in enumerate(pairs):
+        result = PAYOFF[index]
+        if result > 0:
+            wins += int(count)
+        elif result < 0:
+            losses += int(count)
+        else:
+            ties += int(count)
+    return wins, ties, losses
+
+# Strategies pick a move with choose() and are shown the opponent's move with
+# observe(); each is built from a seeded random.Random so matches replay exactly.
+class RandomStrategy:
+    def __init__(self, rng):
+        self.rng = rng
+
+    def choose(self):
+        return self.rng.randrange(3)
+
+    def observe(self, opponent_move):
+        pass
+
+class ConstantStrategy:
+    def __init__(self, rng, move=0):
+        self.move = move
+
+    def choose(self):
+        return self.move
+
+    def observe(self, opponent_move):
+        pass
+
+class CycleStrategy:
+    def __init__(self, rng):
+        self.move = rng.randrange(3)
+
+    def choose(self):
+        self.move = (self.move + 1) % 3
+        return self.move
+
+    def observe(self, opponent_move):
+        pass
+
+class BeatLastStrategy:
+    # plays what would have beaten the opponent's previous move
+    def __init__(self, rng):
+        self.rng = rng
+        self.last = None
+
+    def choose(self):
+        return self.rng.randrange(3) if self.last is None else beats(self.last)
+
+    def observe(self, opponent_move):
+        self.last = opponent_move
+
+class FrequencyStrategy:
+    # counters the opponent's most common move so far
+    def __init__(self, rng):
+        self.rng = rng
+        self.counts = [0, 0, 0]
+
+    def choose(self):
+        best = max(self.counts)
+        return beats(self.rng.choice([move for move in range(3) if self.counts[move] == best]))
+
+    def observe(self, opponent_move):
+        self.counts[opponent_move] += 1
+
+STRATEGIES = {
+    'random': RandomStrategy,
+    'rock': ConstantStrategy,
+    'cycle': CycleStrategy,
+    'beat-last': BeatLastStrategy,
+    'frequency': FrequencyStrategy,
+    'adaptive': lambda rng: AdaptiveOpponent(rng=rng),
+}
+
+def make_strategy(name, rng):
+    try:
+        factory = STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown strategy: {name}") from None
+    return factory(rng)
+
+def play_match(name_a, name_b, rounds, seed):
+    # strategies depend on history, so moves are produced one round at a time
+    # into compact buffers and scored a chunk at a time
+    rng = random.Random(seed)
+    a = make_strategy(name_a, random.Random(rng.getrandbits(64)))
+    b = make_strategy(name_b, random.Random(rng.getrandbits(64)))
+    wins = ties = losses = 0
+    remaining = rounds
+    while remaining > 0:
+        size = min(CHUNK_ROUNDS, remaining)
+        moves_a, moves_b = array('B', bytes(size)), array('B', bytes(size))
+        for i in range(size):
+            move_a, move_b = a.choose(), b.choose()
+            a.observe(move_b)
+            b.observe(move_a)
+            moves_a[i], moves_b[i] = move_a, move_b
+        chunk_wins, chunk_ties, chunk_losses = score_batch(moves_a, moves_b)
+        wins += chunk_wins
+        ties += chunk_ties
+        losses += chunk_losses
+        remaining -= size
+    return wins, ties, losses
+
+def _play_job(job):
+    name_a, name_b, rounds, seed = job
+    return name_a, name_b, play_match(name_a, name_b, rounds, seed)
+
+def match_seed(seed, name_a, name_b, game):
+    # derived from names rather than job order, so results do not depend on
+    # which worker ran what
+    return random.Random(f"{seed}:{name_a}:{name_b}:{game}").getrandbits(64)
+
+def run_tournament(names, rounds, games=1, seed=0, workers=None):
+    # every pair plays `games` matches of `rounds` rounds each; returns
+    # {(a, b): (wins, ties, losses)} from a's side
+    for name in names:
+        if name not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {name}")
+    per_game, extra = divmod(rounds, games)
+    jobs = [(a, b, per_game + (1 if game < extra else 0), match_seed(seed, a, b, game))
+            for a, b in combinations(names, 2) for game in range(games)]
+    results = {pair: (0, 0, 0) for pair in combinations(names, 2)}
+    if workers == 1:
+        finished = map(_play_job, jobs)
+    else:
+        pool = Pool(workers)
+        finished = pool.imap_unordered(_play_job, jobs)
+    try:
+        for a, b, (wins, ties, losses) in finished:
+            total = results[a, b]
+            results[a, b] = (total[0] + wins, total[1] + ties, total[2] + losses)
+    finally:
+        if workers != 1:
+            pool.terminate()
+    return results
+
+def standings(results):
+    # per strategy totals across all its matches, best first
+    totals = {}
+    for (a, b), (wins, ties, losses) in results.items():
+        for name, won, lost in ((a, wins, losses), (b, losses, wins)):
+            row = totals.setdefault(name, {'strategy': name, 'wins': 0, 'ties': 0, 'losses': 0})
+            row['wins'] += won
+            row['ties'] += ties
+            row['losses'] += lost
+    for row in totals.values():
+        played = row['wins'] + row['ties'] + row['losses']
+        row['win_rate'] = round(row['wins'] / played, 4) if played else 0.0
+        row['net'] = row['wins'] - row['losses']
+    return sorted(totals.values(), key=lambda row: (-row['net'], row['strategy']))
+
+def format_tables(results):
+    lines = [f"{'match':32}{'wins':>10}{'ties':>10}{'losses':>10}"]
+    for (a, b), (wins, ties, losses) in sorted(results.items()):
+        lines.append(f"{a + ' vs ' + b:32}{wins:>10}{ties:>10}{losses:>10}")
+    lines.append("")
+    lines.append(f"{'strategy':16}{'wins':>10}{'ties':>10}{'losses':>10}{'net':>10}{'win rate':>10}")
+    for row in standings(results):
+        lines.append(f"{row['strategy']:16}{row['wins']:>10}{row['ties']:>10}{row['losses']:>10}"
+                     f"{row['net']:>10}{row['win_rate']:>10.2%}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a round-robin rock-paper-scissors tournament.")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                        help="comma-separated strategies, any of %(default)s")
+    parser.add_argument("--rounds", type=int, default=100000,
+                        help="rounds per pairing (default: %(default)s)")
+    parser.add_argument("--games", type=int, default=4,
+                        help="independent matches each pairing's rounds are split into (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for reproducible results (default: %(default)s)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    names = list(dict.fromkeys(name for name in args.strategies.split(",") if name))
+    if len(names) < 2:
+        parser.error("need at least two strategies")
+    if args.games < 1 or args.rounds < args.games:
+        parser.error("--rounds must be at least --games, which must be at least 1")
+    try:
+        results = run_tournament(names, args.rounds, args.games, args.seed, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.json:
+        print(json.dumps({
+            'matches': [{'a': a, 'b': b, 'wins': w, 'ties': t, 'losses': l}
+                        for (a, b), (w, t, l) in sorted(results.items())],
+            'standings': standings(results),
+        }, indent=2))
+    else:
+        print(format_tables(results))
+
+if __name__ == "__main__":
+    main()
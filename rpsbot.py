@@ -0,0 +1,77 @@
+import random
+from array import array
+
+ROCK, PAPER, SCISSORS = 0, 1, 2
+MOVES = ("Rock", "Paper", "Scissors")
+# counts in one context are halved once any reaches this, so old habits fade
+COUNT_CAP = 1024
+
+def beats(move):
+    return (move + 1) % 3
+
+class NGramPredictor:
+    # transition counts from the player's last `order` moves to their next one;
+    # the context is the last moves as a base-3 number, kept up to date in O(1)
+    def __init__(self, order):
+        self.order = order
+        self.contexts = 3 ** order
+        self.counts = array('H', bytes(2 * 3 * self.contexts))
+        self.context = 0
+        self.seen = 0
+
+    def predict(self):
+        if self.seen < self.order:
+            return None
+        base = self.context * 3
+        counts = self.counts[base:base + 3]
+        best = max(counts)
+        if best == 0:
+            return None
+        return counts.index(best)
+
+    def update(self, move):
+        if self.seen >= self.order:
+            slot = self.context * 3 + move
+            self.counts[slot] += 1
+            if self.counts[slot] >= COUNT_CAP:
+                base = self.context * 3
+                for i in range(base, base + 3):
+                    self.counts[i] >>= 1
+        self.context = (self.context * 3 + move) % self.contexts
+        self.seen += 1
+
+class AdaptiveOpponent:
+    # an ensemble of n-gram predictors; each votes for the player's next move
+    # with a weight that tracks its recent accuracy, and the opponent plays
+    # whatever beats the winning vote. The work per round depends only on the
+    # number of orders, never on how many rounds have been played.
+    def __init__(self, orders=(0, 1, 2, 3, 4), decay=0.9, rng=None):
+        self.models = [NGramPredictor(order) for order in orders]
+        self.weights = [0.0] * len(self.models)
+        self.decay = decay
+        self.rng = rng if rng is not None else random.Random()
+
+    def choose(self):
+        votes = [0.0, 0.0, 0.0]
+        for model, weight in zip(self.models, self.weights):
+            prediction = model.predict()
+            if prediction is not None:
+                # only models doing better than chance count; the small floor
+                # lets untested models break ties
+                votes[prediction] += max(weight, 0.0) + 1e-3
+        best = max(votes)
+        if best == 0:
+            return self.rng.randrange(3)
+        guesses = [move for move in range(3) if votes[move] == best]
+        return beats(self.rng.choice(guesses))
+
+    def observe(self, player_move):
+        # called after every round with the move the player actually made, so
+        # the models keep learning even while the opponent plays randomly
+        decay = self.decay
+        for i, model in enumerate(self.models):
+            prediction = model.predict()
+            if prediction is not None:
+                hit = 1.0 if prediction == player_move else -0.5
+                self.weights[i] = decay * self.weights[i] + hit
+            model.update(player_move)
@@ -0,0 +1,175 @@
+import argparse
+import math
+import mmap
+import os
+import struct
+from functools import lru_cache
+from hashlib import blake2b
+
+from passgen import CHARACTER_CLASSES, PasswordPolicy
+
+BLOOM_MAGIC = b'BLM1'
+BLOOM_HEADER = struct.Struct('<4sQI')  # magic, bit count, hash count
+DEFAULT_BLOOM_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "breached.bloom")
+# characters outside the known classes still count, as a guess at the rest of printable ASCII
+OTHER_POOL = 33
+RATINGS = ((28, "Very weak"), (36, "Weak"), (60, "Fair"), (128, "Strong"))
+
+def charset_entropy(password):
+    pool = 0
+    seen = set(password)
+    for _, chars in CHARACTER_CLASSES:
+        if not seen.isdisjoint(chars):
+            pool += len(chars)
+            seen.difference_update(chars)
+    if seen:
+        pool += OTHER_POOL
+    return len(password) * math.log2(pool) if pool else 0.0
+
+def rating(bits):
+    for limit, label in RATINGS:
+        if bits < limit:
+            return label
+    return "Very strong"
+
+def _positions(word, bits, hashes):
+    digest = blake2b(word.encode('utf-8'), digest_size=16).digest()
+    first, second = struct.unpack('<QQ', digest)
+    # double hashing: k probes from two independent 64-bit halves
+    return [(first + i * second) % bits for i in range(hashes)]
+
+def bloom_parameters(count, error_rate):
+    bits = max(8, math.ceil(-count * math.log(error_rate) / math.log(2) ** 2))
+    hashes = max(1, round(bits / max(count, 1) * math.log(2)))
+    return bits, hashes
+
+def build_bloom(words, filename, count, error_rate=0.001):
+    bits, hashes = bloom_parameters(count, error_rate)
+    table = bytearray((bits + 7) // 8)
+    added = 0
+    for word in words:
+        for pos in _positions(word, bits, hashes):
+            table[pos >> 3] |= 1 << (pos & 7)
+        added += 1
+    tmp = filename + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, bits, hashes))
+        f.write(table)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+    return added
+
+def _iter_words(filename):
+    with open(filename, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            word = line.rstrip('\r\n')
+            if word:
+                yield word
+
+class BloomFilter:
+    # the bit table stays on disk and is paged in by the OS as probes touch it
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"{filename} is not a Bloom filter file")
+        if len(self.map) < BLOOM_HEADER.size:
+            self.close()
+            raise ValueError(f"{filename} is not a Bloom filter file")
+        magic, self.bits, self.hashes = BLOOM_HEADER.unpack_from(self.map, 0)
+        if magic != BLOOM_MAGIC:
+            self.close()
+            raise ValueError(f"{filename} is not a Bloom filter file")
+        if len(self.map) < BLOOM_HEADER.size + (self.bits + 7) // 8:
+            # a cut-short table would fail on the first probe past its end
+            self.close()
+            raise ValueError(f"{filename} is truncated")
+
+    def __contains__(self, word):
+        table, offset = self.map, BLOOM_HEADER.size
+        for pos in _positions(word, self.bits, self.hashes):
+            if not table[offset + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+class StrengthMeter:
+    def __init__(self, bloom_file=None, cache_size=4096):
+        self.breached = BloomFilter(bloom_file) if bloom_file else None
+        self.check = lru_cache(maxsize=cache_size)(self._check)
+
+    def _check(self, password, policy=None):
+        # returns (bits, label, breached); a password that fits the policy (a
+        # PasswordPolicy or a PassphrasePolicy) is judged by the policy, anything
+        # else by the characters it uses
+        if not password:
+            return 0.0, "", False
+        if self.breached is not None and password in self.breached:
+            return 0.0, "Breached", True
+        if policy is not None and policy.fits(password):
+            bits = policy.entropy()
+        else:
+            bits = charset_entropy(password)
+        return bits, rating(bits), False
+
+    def close(self):
+        self.check.cache_clear()
+        if self.breached is not None:
+            self.breached.close()
+
+def open_default_meter():
+    # the breach check is optional; without a compiled filter only entropy is shown
+    if os.path.exists(DEFAULT_BLOOM_FILE):
+        try:
+            return StrengthMeter(DEFAULT_BLOOM_FILE)
+        except (OSError, ValueError):
+            pass
+    return StrengthMeter()
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a breached-password Bloom filter or check passwords against it.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="compile a word list (one password per line) into a Bloom filter")
+    build.add_argument("wordlist")
+    build.add_argument("output", nargs="?", default=DEFAULT_BLOOM_FILE,
+                       help="filter file to write (default: %(default)s)")
+    build.add_argument("--error-rate", type=float, default=0.001,
+                       help="false-positive rate to size the filter for (default: %(default)s)")
+    check = commands.add_parser("check", help="rate passwords")
+    check.add_argument("passwords", nargs="+")
+    check.add_argument("--bloom", default=DEFAULT_BLOOM_FILE, help="filter file (default: %(default)s)")
+    check.add_argument("-l", "--length", type=int, help="judge against the policy of this length")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if not 0 < args.error_rate < 1:
+            parser.error("error rate must be between 0 and 1")
+        # a first pass counts the words so the filter can be sized before filling it
+        count = sum(1 for _ in _iter_words(args.wordlist))
+        added = build_bloom(_iter_words(args.wordlist), args.output, count, args.error_rate)
+        bits, hashes = bloom_parameters(count, args.error_rate)
+        print(f"Wrote {added} passwords to {args.output} ({(bits + 7) // 8} bytes, {hashes} hashes)")
+        return
+
+    try:
+        policy = PasswordPolicy(args.length) if args.length else None
+    except ValueError as e:
+        parser.error(str(e))
+    meter = StrengthMeter(args.bloom if os.path.exists(args.bloom) else None)
+    try:
+        for password in args.passwords:
+            bits, label, _ = meter.check(password, policy)
+            print(f"{label:12} {bits:6.1f} bits  {password}")
+    finally:
+        meter.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,815 @@
 
+import argparse
+import bisect
+import csv
 import json
 import os
-from datetime import datetime
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
 from tkinter import *
 from tkinter import ttk, messagebox
 
+from background_writer import BackgroundWriter, batched, write_json_atomic
+
+PRIORITIES = ("low", "medium", "high")
+TASK_FIELDS = ["id", "description", "priority", "due_date", "completed", "created_at"]
+
+def normalize_task(item):
+    description = str(item.get("description") or "").strip()
+    if not description:
+        raise ValueError("Task description cannot be empty")
+    priority = str(item.get("priority") or "medium").strip().lower()
+    if priority not in PRIORITIES:
+        raise ValueError(f"Invalid priority: {priority}")
+    due_date = item.get("due_date") or None
+    if due_date:
+        due_date = str(due_date).strip()
+        datetime.strptime(due_date, "%Y-%m-%d")
+    completed = item.get("completed", False)
+    if isinstance(completed, str):
+        completed = completed.strip().lower() in ("1", "true", "yes", "y")
+    return {
+        "description": description,
+        "priority": priority,
+        "due_date": due_date,
+        "completed": bool(completed)
+    }
+
+class BatchError(ValueError):
+    # a whole batch was rejected because of the task at `index`
+    def __init__(self, index, error):
+        super().__init__(f"Task {index + 1} in batch: {error}")
+        self.index = index
+        self.error = error
+
+class ImportFailed(ValueError):
+    # `imported` tasks from earlier batches were already added when it failed
+    def __init__(self, message, imported):
+        super().__init__(message)
+        self.imported = imported
+
+def _normalize_batch(items):
+    batch = []
+    for i, item in enumerate(items):
+        try:
+            batch.append(normalize_task(item))
+        except ValueError as e:
+            raise BatchError(i, e) from None
+    return batch
+
+def _encode(record):
+    return json.dumps(record, default=str) + "\n"
+
+def due_ordinal(due_date):
+    if not due_date:
+        return None
+    try:
+        return date.fromisoformat(str(due_date)).toordinal()
+    except ValueError:
+        return None
+
+class DueDateIndex:
+    def __init__(self):
+        # sorted (ordinal, id) pairs for pending tasks that have a due date
+        self.keys = []
+        self.ordinals = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, task_id, due_date):
+        ordinal = due_ordinal(due_date)
+        if ordinal is None or task_id in self.ordinals:
+            return
+        self.ordinals[task_id] = ordinal
+        bisect.insort(self.keys, (ordinal, task_id))
+
+    def remove(self, task_id):
+        ordinal = self.ordinals.pop(task_id, None)
+        if ordinal is None:
+            return
+        i = bisect.bisect_left(self.keys, (ordinal, task_id))
+        del self.keys[i]
+
+    def between(self, first=None, last=None):
+        # ids due in [first, last] (ordinals, inclusive) in due order
+        lo = 0 if first is None else bisect.bisect_left(self.keys, (first,))
+        hi = len(self.keys) if last is None else bisect.bisect_left(self.keys, (last + 1,))
+        return [task_id for _, task_id in self.keys[lo:hi]]
+
+    def first_after(self, ordinal=None):
+        i = 0 if ordinal is None else bisect.bisect_left(self.keys, (ordinal + 1,))
+        return self.keys[i] if i < len(self.keys) else None
+
+class TaskStore:
+    def __init__(self, tasks=()):
+        self.clear()
+        for task in tasks:
+            self.add(task)
+
+    def clear(self):
+        # by_id keeps tombstoned records so their ids are never reused
+        self.by_id = {}
+        self.live = {}
+        self.tombstones = {}
+        self.next_id = 1
+        # secondary indexes map a key to an insertion-ordered {id: task} dict
+        self.by_completed = {False: {}, True: {}}
+        self.by_priority = {}
+        self.by_due_date = {}
+        self.due = DueDateIndex()
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def _index(self, task):
+        task_id = task["id"]
+        if task.get("deleted", False):
+            self.tombstones[task_id] = task
+            return
+        self.live[task_id] = task
+        self.by_completed[bool(task.get("completed", False))][task_id] = task
+        self.by_priority.setdefault(task.get("priority"), {})[task_id] = task
+        self.by_due_date.setdefault(task.get("due_date"), {})[task_id] = task
+        if not task.get("completed", False):
+            self.due.add(task_id, task.get("due_date"))
+
+    def _unindex(self, task):
+        task_id = task["id"]
+        self.live.pop(task_id, None)
+        self.due.remove(task_id)
+        self.by_completed[bool(task.get("completed", False))].pop(task_id, None)
+        for index, key in ((self.by_priority, task.get("priority")),
+                           (self.by_due_date, task.get("due_date"))):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(task_id, None)
+                if not bucket:
+                    del index[key]
+
+    def add(self, task):
+        self.by_id[task["id"]] = task
+        self.next_id = max(self.next_id, task["id"] + 1)
+        self._index(task)
+
+    def get(self, task_id):
+        return self.live.get(task_id)
+
+    def set_completed(self, task_id):
+        task = self.live.get(task_id)
+        if task is None:
+            return False
+        if not task.get("completed", False):
+            self.by_completed[False].pop(task_id, None)
+            self.due.remove(task_id)
+            task["completed"] = True
+            self.by_completed[True][task_id] = task
+        return True
+
+    def tombstone(self, task_id):
+        task = self.live.get(task_id)
+        if task is None:
+            return None
+        self._unindex(task)
+        task["deleted"] = True
+        self.tombstones[task_id] = task
+        return task
+
+    def purge(self, renumber=False):
+        purged = len(self.tombstones)
+        tasks = list(self.live.values())
+        next_id = self.next_id
+        self.clear()
+        if renumber:
+            for i, task in enumerate(tasks, 1):
+                task["id"] = i
+                self.add(task)
+        else:
+            for task in tasks:
+                self.add(task)
+            self.next_id = next_id
+        return purged
+
+    def select(self, completed=None, priority=None, due_date=None):
+        # start from the smallest matching index bucket and filter the rest
+        candidates = [self.live]
+        if completed is not None:
+            candidates.append(self.by_completed[bool(completed)])
+        if priority is not None:
+            candidates.append(self.by_priority.get(priority.lower(), {}))
+        if due_date is not None:
+            candidates.append(self.by_due_date.get(due_date, {}))
+        bucket = min(candidates, key=len)
+        tasks = [
+            task for task in bucket.values()
+            if (completed is None or bool(task.get("completed", False)) == bool(completed))
+            and (priority is None or task.get("priority") == priority.lower())
+            and (due_date is None or task.get("due_date") == due_date)
+        ]
+        # buckets are mostly in id order already, so this is close to linear
+        tasks.sort(key=lambda task: task["id"])
+        return tasks
+
 class ToDoList:
-    def __init__(self, filename="todo.json"):
+    def __init__(self, filename="todo.json", journal=True, compact_threshold=256 * 1024,
+                 writer=None, compact_ratio=0.5):
         self.filename = filename
-        self.tasks = []
+        # journal mode appends one record per change to <filename>.log and
+        # only rewrites the full snapshot when the log grows past the threshold,
+        # or past compact_ratio times the snapshot if that is larger, so the
+        # cost of rewriting stays in proportion to the changes that paid for it
+        self.journal = journal
+        self.journal_file = filename + ".log"
+        self.compact_threshold = compact_threshold
+        self.compact_ratio = compact_ratio
+        self._snapshot_size = 0
+        # with a BackgroundWriter all file I/O moves to its thread; records
+        # wait for it already serialized, as the tasks they hold keep changing
+        self.writer = writer
+        self._pending = []
+        self.store = TaskStore()
+        self._seq = 0
+        self._log = None
+        self._log_size = 0
+        self._lock = threading.Lock()
+        self._compactor = None
         self.load_tasks()
 
+    @property
+    def tasks(self):
+        return self.store.select()
+
     def load_tasks(self):
+        tasks = []
+        next_id = 1
+        self._seq = 0
         if os.path.exists(self.filename):
+            self._snapshot_size = os.path.getsize(self.filename)
             with open(self.filename, 'r') as f:
                 try:
-                    self.tasks = json.load(f)
+                    data = json.load(f)
                 except json.JSONDecodeError:
                     # if file is empty or invalid, start with empty list
-                    self.tasks = []
+                    data = []
+            # older files hold a bare list of tasks without a sequence number
+            if isinstance(data, dict):
+                tasks = data.get("tasks", [])
+                self._seq = data.get("seq", 0)
+                next_id = data.get("next_id", 1)
+            else:
+                tasks = data
+        self.store = TaskStore(tasks)
+        self.store.next_id = max(self.store.next_id, next_id)
+        if self.journal:
+            # a leftover .old log means a compaction did not finish
+            for path in (self.journal_file + ".old", self.journal_file):
+                self._replay(path)
+            if os.path.exists(self.journal_file + ".old"):
+                self._write_snapshot(list(self.store), self._seq, self.store.next_id)
+                self._truncate_journal()
+
+    def _replay(self, path):
+        if not os.path.exists(path):
+            return
+        good = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    record = json.loads(line)
+                except ValueError:
+                    # a torn last line from a crash mid-append
+                    break
+                good += len(line)
+                if record.get("seq", 0) <= self._seq:
+                    continue
+                self._apply(record)
+                self._seq = record["seq"]
+        if good < os.path.getsize(path):
+            # cut the torn tail off, or the next append would be glued onto it
+            # and lost on the following load
+            with open(path, 'r+b') as f:
+                f.truncate(good)
 
     def save_tasks(self):
-        with open(self.filename, 'w') as f:
-            json.dump(self.tasks, f, indent=4, default=str)
+        if self.writer is not None:
+            self.writer.schedule(self.filename, self._flush_snapshot)
+            return
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            self._write_snapshot(list(self.store), self._seq, self.store.next_id)
+            if self.journal:
+                self._truncate_journal()
+
+    def _write_snapshot(self, tasks, seq, next_id):
+        write_json_atomic(self.filename, {"seq": seq, "next_id": next_id, "tasks": tasks},
+                          indent=4, default=str)
+        self._snapshot_size = os.path.getsize(self.filename)
+
+    def _compact_due(self):
+        return self._log_size >= max(self.compact_threshold, self.compact_ratio * self._snapshot_size)
+
+    def _truncate_journal(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        for path in (self.journal_file, self.journal_file + ".old"):
+            if os.path.exists(path):
+                os.remove(path)
+        self._log_size = 0
+
+    def _append(self, *records):
+        self._write_lines("".join(_encode(record) for record in records))
+
+    def _write_lines(self, lines):
+        if self._log is None:
+            self._log = open(self.journal_file, 'a')
+            self._log_size = self._log.tell()
+        self._log.write(lines)
+        self._log.flush()
+        self._log_size += len(lines)
+
+    def _flush_journal(self):
+        # runs on the writer thread, the only one touching the files in this mode
+        with self._lock:
+            lines, self._pending = self._pending, []
+        try:
+            self._write_lines("".join(lines))
+        except Exception:
+            with self._lock:
+                self._pending[:0] = lines
+            raise
+        if self._compact_due():
+            self._flush_snapshot()
+
+    def _flush_snapshot(self):
+        with self._lock:
+            tasks = [dict(task) for task in self.store]
+            seq, next_id = self._seq, self.store.next_id
+        self._write_snapshot(tasks, seq, next_id)
+        # records still pending go to the fresh log; those committed before the
+        # tasks were copied are already in this snapshot, and their seq being no
+        # higher than its seq makes replay skip them
+        if self.journal:
+            self._truncate_journal()
+
+    def _maybe_compact(self):
+        if not self._compact_due():
+            return
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        # rotate the log so new changes keep appending while the snapshot is written
+        self._log.close()
+        self._log = None
+        self._log_size = 0
+        os.replace(self.journal_file, self.journal_file + ".old")
+        tasks = [dict(task) for task in self.store]
+        self._compactor = threading.Thread(
+            target=self._compact, args=(tasks, self._seq, self.store.next_id), daemon=True
+        )
+        self._compactor.start()
+
+    def _compact(self, tasks, seq, next_id):
+        self._write_snapshot(tasks, seq, next_id)
+        os.remove(self.journal_file + ".old")
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.flush()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def _commit(self, record, always=False):
+        with self._lock:
+            result = self._apply(record)
+            if not result and not always:
+                return result
+            self._seq += 1
+            record["seq"] = self._seq
+            if self.writer is not None:
+                if self.journal:
+                    self._pending.append(_encode(record))
+                    self.writer.schedule(self.journal_file, self._flush_journal)
+                else:
+                    self.writer.schedule(self.filename, self._flush_snapshot)
+            elif self.journal:
+                self._append(record)
+                self._maybe_compact()
+            else:
+                self._write_snapshot(list(self.store), self._seq, self.store.next_id)
+        return result
+
+    def _apply(self, record):
+        op = record["op"]
+        if op == "add":
+            task = record["task"]
+            self.store.add(task)
+            return task
+        if op == "complete":
+            return self.store.set_completed(record["id"])
+        if op == "delete":
+            # ids stay stable; the record is only marked as deleted
+            return self.store.tombstone(record["id"]) is not None
+        if op == "clear_completed":
+            completed = list(self.store.by_completed[True])
+            for task_id in completed:
+                self.store.tombstone(task_id)
+            return len(completed)
+        if op == "purge":
+            return self.store.purge(record.get("renumber", False))
+        if op == "add_many":
+            for task in record["tasks"]:
+                self.store.add(task)
+            return record["tasks"]
+        if op == "complete_many":
+            return sum(1 for task_id in record["ids"] if self.store.set_completed(task_id))
+        if op == "delete_many":
+            return sum(1 for task_id in record["ids"] if self.store.tombstone(task_id) is not None)
+        raise ValueError(f"Unknown journal operation: {op}")
 
     def add_task(self, description, priority="medium", due_date=None):
-        # compute next id robustly (handles deletions)
-        next_id = max((task.get("id", 0) for task in self.tasks), default=0) + 1
         task = {
-            "id": next_id,
+            "id": self.store.next_id,
             "description": description,
             "priority": priority.lower(),
             "due_date": due_date,
             "completed": False,
             "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
-        self.tasks.append(task)
-        self.save_tasks()
+        return self._commit({"op": "add", "task": task})
+
+    def add_tasks(self, items):
+        # the whole batch is validated first and written as one journal record
+        batch = _normalize_batch(items)
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        tasks = []
+        for task_id, fields in enumerate(batch, self.store.next_id):
+            tasks.append({"id": task_id, **fields, "created_at": created_at})
+        return self._commit({"op": "add_many", "tasks": tasks})
+
+    def get_task(self, task_id):
+        return self.store.get(task_id)
+
+    def get_tasks(self, show_completed=False, priority=None, due_date=None):
+        return self.store.select(
+            completed=None if show_completed else False,
+            priority=priority,
+            due_date=due_date
+        )
+
+    def tasks_due_between(self, first=None, last=None):
+        first = first.toordinal() if first else None
+        last = last.toordinal() if last else None
+        return [self.store.live[task_id] for task_id in self.store.due.between(first, last)]
+
+    def overdue_tasks(self, today=None):
+        today = today or date.today()
+        return self.tasks_due_between(last=today - timedelta(days=1))
+
+    def upcoming_tasks(self, days=7, today=None):
+        today = today or date.today()
+        return self.tasks_due_between(today, today + timedelta(days=days))
+
+    def next_due_task(self, after=None):
+        key = self.store.due.first_after(after.toordinal() if after else None)
+        return self.store.live[key[1]] if key else None
+
+    def iter_tasks(self, show_completed=True):
+        # live tasks are kept in id order, so no sort is needed
+        for task in list(self.store.live.values()):
+            if show_completed or not task.get("completed", False):
+                yield task
+
+    def complete_task(self, task_id):
+        return self._commit({"op": "complete", "id": task_id})
+
+    def delete_task(self, task_id):
+        return self._commit({"op": "delete", "id": task_id})
+
+    def complete_tasks(self, task_ids):
+        return self._commit({"op": "complete_many", "ids": list(task_ids)})
+
+    def delete_tasks(self, task_ids):
+        return self._commit({"op": "delete_many", "ids": list(task_ids)})
+
+    def clear_completed(self):
+        return self._commit({"op": "clear_completed"})
+
+    def purge_deleted(self, renumber=False):
+        # maintenance: drop tombstoned records, optionally closing the id gaps
+        return self._commit({"op": "purge", "renumber": renumber}, always=renumber)
+
+class SQLiteToDoList:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            description TEXT NOT NULL,
+            priority TEXT NOT NULL DEFAULT 'medium',
+            due_date TEXT,
+            completed INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT,
+            deleted INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (deleted, completed, id);
+        CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority, id);
+        CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date, id);
+    """
+    COLUMNS = "id, description, priority, due_date, completed, created_at"
+
+    def __init__(self, filename="todo.db"):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def _row_to_task(self, row):
+        task = dict(row)
+        task["completed"] = bool(task["completed"])
         return task
 
-    def get_tasks(self, show_completed=False):
+    @property
+    def tasks(self):
+        return self.get_tasks(show_completed=True)
+
+    def load_tasks(self):
+        # rows are read on demand, nothing to load up front
+        pass
+
+    def save_tasks(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def add_task(self, description, priority="medium", due_date=None):
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO tasks (description, priority, due_date, created_at) VALUES (?, ?, ?, ?)",
+                (description, priority.lower(), due_date, created_at)
+            )
+        return self.get_task(cursor.lastrowid)
+
+    def add_tasks(self, items):
+        batch = _normalize_batch(items)
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        tasks = []
+        with self.conn:
+            for fields in batch:
+                cursor = self.conn.execute(
+                    "INSERT INTO tasks (description, priority, due_date, completed, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (fields["description"], fields["priority"], fields["due_date"],
+                     int(fields["completed"]), created_at)
+                )
+                tasks.append({"id": cursor.lastrowid, **fields, "created_at": created_at})
+        return tasks
+
+    def get_task(self, task_id):
+        row = self.conn.execute(
+            f"SELECT {self.COLUMNS} FROM tasks WHERE id = ? AND deleted = 0", (task_id,)
+        ).fetchone()
+        return self._row_to_task(row) if row else None
+
+    def get_tasks(self, show_completed=False, priority=None, due_date=None):
+        query = f"SELECT {self.COLUMNS} FROM tasks WHERE deleted = 0"
+        params = []
+        if not show_completed:
+            query += " AND completed = 0"
+        if priority is not None:
+            query += " AND priority = ?"
+            params.append(priority.lower())
+        if due_date is not None:
+            query += " AND due_date = ?"
+            params.append(due_date)
+        query += " ORDER BY id"
+        return [self._row_to_task(row) for row in self.conn.execute(query, params)]
+
+    def tasks_due_between(self, first=None, last=None):
+        query = (f"SELECT {self.COLUMNS} FROM tasks "
+                 "WHERE deleted = 0 AND completed = 0 AND due_date IS NOT NULL")
+        params = []
+        if first:
+            query += " AND due_date >= ?"
+            params.append(first.isoformat())
+        if last:
+            query += " AND due_date <= ?"
+            params.append(last.isoformat())
+        query += " ORDER BY due_date, id"
+        return [self._row_to_task(row) for row in self.conn.execute(query, params)]
+
+    def overdue_tasks(self, today=None):
+        today = today or date.today()
+        return self.tasks_due_between(last=today - timedelta(days=1))
+
+    def upcoming_tasks(self, days=7, today=None):
+        today = today or date.today()
+        return self.tasks_due_between(today, today + timedelta(days=days))
+
+    def next_due_task(self, after=None):
+        query = (f"SELECT {self.COLUMNS} FROM tasks "
+                 "WHERE deleted = 0 AND completed = 0 AND due_date > ? "
+                 "ORDER BY due_date, id LIMIT 1")
+        row = self.conn.execute(query, (after.isoformat() if after else "",)).fetchone()
+        return self._row_to_task(row) if row else None
+
+    def iter_tasks(self, show_completed=True):
+        query = f"SELECT {self.COLUMNS} FROM tasks WHERE deleted = 0"
         if not show_completed:
-            return [task for task in self.tasks if not task.get("completed", False)]
-        return self.tasks
+            query += " AND completed = 0"
+        for row in self.conn.execute(query + " ORDER BY id"):
+            yield self._row_to_task(row)
 
     def complete_task(self, task_id):
-        for task in self.tasks:
-            if task.get("id") == task_id:
-                task["completed"] = True
-                self.save_tasks()
-                return True
-        return False
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET completed = 1 WHERE id = ? AND deleted = 0", (task_id,)
+            )
+        return cursor.rowcount > 0
 
     def delete_task(self, task_id):
-        original_len = len(self.tasks)
-        self.tasks = [task for task in self.tasks if task.get("id") != task_id]
-        # re-number IDs if you want continuous ids (optional). I'll reassign so UI stays consistent.
-        for i, task in enumerate(self.tasks, 1):
-            task["id"] = i
-        self.save_tasks()
-        return len(self.tasks) != original_len
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET deleted = 1 WHERE id = ? AND deleted = 0", (task_id,)
+            )
+        return cursor.rowcount > 0
+
+    def complete_tasks(self, task_ids):
+        with self.conn:
+            cursor = self.conn.executemany(
+                "UPDATE tasks SET completed = 1 WHERE id = ? AND deleted = 0 AND completed = 0",
+                ((task_id,) for task_id in task_ids)
+            )
+        return cursor.rowcount
+
+    def delete_tasks(self, task_ids):
+        with self.conn:
+            cursor = self.conn.executemany(
+                "UPDATE tasks SET deleted = 1 WHERE id = ? AND deleted = 0",
+                ((task_id,) for task_id in task_ids)
+            )
+        return cursor.rowcount
 
     def clear_completed(self):
-        initial_count = len(self.tasks)
-        self.tasks = [task for task in self.tasks if not task.get("completed", False)]
-        for i, task in enumerate(self.tasks, 1):
-            task["id"] = i
-        self.save_tasks()
-        return initial_count - len(self.tasks)
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET deleted = 1 WHERE completed = 1 AND deleted = 0"
+            )
+        return cursor.rowcount
+
+    def purge_deleted(self, renumber=False):
+        with self.conn:
+            purged = self.conn.execute("DELETE FROM tasks WHERE deleted = 1").rowcount
+            if renumber:
+                # number the rows once into a keyed temp table, then move only the
+                # rows whose id changes, through negative ids so the primary key
+                # never collides mid-update
+                self.conn.execute("DROP TABLE IF EXISTS temp.renumber")
+                self.conn.execute(
+                    "CREATE TEMP TABLE renumber (old_id INTEGER PRIMARY KEY, new_id INTEGER NOT NULL)"
+                )
+                self.conn.execute(
+                    "INSERT INTO temp.renumber (old_id, new_id) "
+                    "SELECT id, ROW_NUMBER() OVER (ORDER BY id) FROM tasks"
+                )
+                self.conn.execute("DELETE FROM temp.renumber WHERE old_id = new_id")
+                self.conn.execute(
+                    "UPDATE tasks SET id = -(SELECT new_id FROM temp.renumber WHERE old_id = tasks.id) "
+                    "WHERE id IN (SELECT old_id FROM temp.renumber)"
+                )
+                self.conn.execute("UPDATE tasks SET id = -id WHERE id < 0")
+                self.conn.execute("DROP TABLE temp.renumber")
+                self.conn.execute(
+                    "UPDATE sqlite_sequence SET seq = (SELECT COALESCE(MAX(id), 0) FROM tasks) "
+                    "WHERE name = 'tasks'"
+                )
+        return purged
+
+def migrate_json_to_sqlite(json_filename="todo.json", db_filename="todo.db"):
+    source = ToDoList(json_filename)
+    target = SQLiteToDoList(db_filename)
+    try:
+        if target.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]:
+            raise ValueError(f"{db_filename} already contains tasks")
+        records = list(source.store)
+        with target.conn:
+            # keep ids and tombstones so existing references stay valid
+            target.conn.executemany(
+                "INSERT INTO tasks (id, description, priority, due_date, completed, created_at, deleted) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (task["id"], task.get("description", ""), task.get("priority", "medium"),
+                     task.get("due_date"), int(bool(task.get("completed", False))),
+                     task.get("created_at"), int(bool(task.get("deleted", False))))
+                    for task in records
+                ]
+            )
+            # sqlite_sequence has no unique key, and the inserts above already
+            # created the row for tasks, so it is updated rather than replaced
+            seq = source.store.next_id - 1
+            if not target.conn.execute(
+                "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'tasks'", (seq,)
+            ).rowcount:
+                target.conn.execute(
+                    "INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', ?)", (seq,)
+                )
+        return len(records)
+    finally:
+        source.close()
+        target.close()
+
+# the readers yield (line number, record) so errors can point into the file
+def iter_ndjson_tasks(f):
+    for number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"line {number}: invalid JSON ({e.msg})") from None
+        if not isinstance(item, dict):
+            raise ValueError(f"line {number}: expected a JSON object")
+        yield number, item
+
+def iter_csv_tasks(f):
+    reader = csv.DictReader(f)
+    for row in reader:
+        yield reader.line_num, row
+
+def import_tasks(todo, filename, batch_size=5000):
+    # each batch is added on its own, so a bad record stops the import with
+    # the batches before it already in; ImportFailed says where and how many
+    reader = iter_csv_tasks if filename.endswith(".csv") else iter_ndjson_tasks
+    count = 0
+    with open(filename, 'r', newline='') as f:
+        try:
+            for batch in batched(reader(f), batch_size):
+                try:
+                    count += len(todo.add_tasks([item for _, item in batch]))
+                except BatchError as e:
+                    raise ValueError(f"line {batch[e.index][0]}: {e.error}") from None
+        except ValueError as e:
+            raise ImportFailed(f"{filename}, {e}", count) from None
+    return count
+
+def export_tasks(todo, filename, show_completed=True):
+    count = 0
+    with open(filename, 'w', newline='') as f:
+        if filename.endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=TASK_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for task in todo.iter_tasks(show_completed):
+                writer.writerow(task)
+                count += 1
+        else:
+            for task in todo.iter_tasks(show_completed):
+                f.write(json.dumps({field: task.get(field) for field in TASK_FIELDS}) + "\n")
+                count += 1
+    return count
+
+def open_todo_list(filename="todo.json", writer=None):
+    if filename.endswith((".db", ".sqlite", ".sqlite3")):
+        # SQLite commits are small transactions on its own connection, so they stay inline
+        return SQLiteToDoList(filename)
+    return ToDoList(filename, writer=writer)
+
+MAX_REMINDER_WAIT_MS = 6 * 60 * 60 * 1000
 
 class ToDoApp:
-    def __init__(self, root):
+    def __init__(self, root, filename="todo.json"):
         self.root = root
         self.root.title("To-Do List Application")
         self.root.geometry("900x600")
-        self.todo = ToDoList()
+        self.writer = BackgroundWriter()
+        self.todo = open_todo_list(filename, self.writer)
+        self.rows = {}  # Treeview iid (task id) -> values currently shown
+        self.reminder_job = None
+        self.reminded_through = None  # last day whose due tasks were announced
         self.create_widgets()
         self.refresh_task_list()
+        self.root.after_idle(self.check_reminders)
+        self.writer.poll_errors(self.root, self.show_save_error)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def show_save_error(self, filename, error):
+        messagebox.showerror("Error", f"Failed to save {filename}:\n{error}")
+
+    def on_close(self):
+        self.todo.close()
+        self.writer.close()
+        self.root.destroy()
 
     def create_widgets(self):
         add_frame = LabelFrame(self.root, text="Add New Task", padx=10, pady=10)
@@ -146,23 +879,76 @@ class ToDoApp:
         # Double-click to toggle complete (optional UX)
         self.task_tree.bind("<Double-1>", lambda e: self.complete_task())
 
+    def _task_values(self, task):
+        status = "Completed" if task.get("completed") else "Pending"
+        due = task.get("due_date") if task.get("due_date") else ""
+        return (
+            task.get("id"),
+            task.get("description"),
+            task.get("priority", "").capitalize(),
+            due,
+            status
+        )
+
     def refresh_task_list(self):
-        for item in self.task_tree.get_children():
-            self.task_tree.delete(item)
-        
+        # diff against the rows already in the tree so only changed rows touch Tk;
+        # hidden completed rows are detached rather than deleted
         show_completed = bool(self.show_completed_var.get())
-        tasks = self.todo.get_tasks(show_completed)
-        
-        for task in tasks:
-            status = "Completed" if task.get("completed") else "Pending"
-            due = task.get("due_date") if task.get("due_date") else ""
-            self.task_tree.insert("", "end", values=(
-                task.get("id"),
-                task.get("description"),
-                task.get("priority", "").capitalize(),
-                due,
-                status
-            ))
+        visible = []
+        seen = set()
+        for task in self.todo.get_tasks(show_completed=True):
+            iid = str(task.get("id"))
+            seen.add(iid)
+            values = self._task_values(task)
+            if iid not in self.rows:
+                self.task_tree.insert("", "end", iid=iid, values=values)
+            elif self.rows[iid] != values:
+                self.task_tree.item(iid, values=values)
+            self.rows[iid] = values
+            if show_completed or not task.get("completed"):
+                visible.append(iid)
+
+        removed = [iid for iid in self.rows if iid not in seen]
+        if removed:
+            self.task_tree.delete(*removed)
+            for iid in removed:
+                del self.rows[iid]
+
+        children = self.task_tree.get_children()
+        if list(children) != visible:
+            visible_set = set(visible)
+            hidden = [iid for iid in children if iid not in visible_set]
+            if len(children) - len(hidden) == len(visible):
+                self.task_tree.detach(*hidden)
+            else:
+                self.task_tree.set_children("", *visible)
+
+    def check_reminders(self):
+        self.reminder_job = None
+        today = date.today()
+        first = self.reminded_through + timedelta(days=1) if self.reminded_through else None
+        due = self.todo.tasks_due_between(first, today)
+        self.reminded_through = today
+        if due:
+            lines = [f"#{task['id']} {task['description']} (due {task['due_date']})" for task in due[:10]]
+            if len(due) > 10:
+                lines.append(f"... and {len(due) - 10} more")
+            messagebox.showwarning("Reminder", "Tasks due:\n" + "\n".join(lines))
+        self.schedule_reminder()
+
+    def schedule_reminder(self):
+        # one timer for the next deadline only; it is re-armed after it fires
+        if self.reminder_job is not None:
+            self.root.after_cancel(self.reminder_job)
+            self.reminder_job = None
+        task = self.todo.next_due_task(after=self.reminded_through)
+        if task is None:
+            return
+        wake = datetime.combine(date.fromisoformat(task["due_date"]), datetime.min.time())
+        delay_ms = int((wake - datetime.now()).total_seconds() * 1000)
+        # long waits are capped; waking early just re-checks the index
+        delay_ms = max(0, min(delay_ms, MAX_REMINDER_WAIT_MS))
+        self.reminder_job = self.root.after(delay_ms, self.check_reminders)
 
     def add_task(self):
         description = self.description_entry.get().strip()
@@ -184,18 +970,16 @@ class ToDoApp:
         self.description_entry.delete(0, END)
         self.due_date_entry.delete(0, END)
         self.refresh_task_list()
+        if due_date and self.reminded_through is not None:
+            self.schedule_reminder()
         messagebox.showinfo("Success", "Task added successfully")
 
     def _get_selected_task_id(self):
         selected = self.task_tree.selection()
         if not selected:
             return None
-        item_id = selected[0]
-        values = self.task_tree.item(item_id, "values")
-        if not values:
-            return None
         try:
-            return int(values[0])
+            return int(selected[0])
         except (ValueError, TypeError):
             return None
 
@@ -231,8 +1015,38 @@ class ToDoApp:
             messagebox.showinfo("Success", f"Removed {removed} completed tasks")
 
 def main():
+    parser = argparse.ArgumentParser(description="To-Do List Application")
+    parser.add_argument("filename", nargs="?", default="todo.json",
+                        help="task file; .db/.sqlite files use the SQLite backend")
+    parser.add_argument("--migrate", metavar="DB",
+                        help="copy the JSON task file into a new SQLite database and exit")
+    parser.add_argument("--import", dest="import_file", metavar="FILE",
+                        help="add tasks from an .ndjson or .csv file and exit")
+    parser.add_argument("--export", dest="export_file", metavar="FILE",
+                        help="write all tasks to an .ndjson or .csv file and exit")
+    args = parser.parse_args()
+    if args.migrate:
+        count = migrate_json_to_sqlite(args.filename, args.migrate)
+        print(f"Migrated {count} tasks from {args.filename} to {args.migrate}")
+        return
+    if args.import_file or args.export_file:
+        todo = open_todo_list(args.filename)
+        try:
+            if args.import_file:
+                try:
+                    count = import_tasks(todo, args.import_file)
+                except ImportFailed as e:
+                    parser.exit(1, f"Import stopped at {e}\n"
+                                   f"{e.imported} tasks before it were already imported\n")
+                print(f"Imported {count} tasks from {args.import_file}")
+            if args.export_file:
+                count = export_tasks(todo, args.export_file)
+                print(f"Exported {count} tasks to {args.export_file}")
+        finally:
+            todo.close()
+        return
     root = Tk()
-    app = ToDoApp(root)
+    app = ToDoApp(root, args.filename)
     root.mainloop()
 
 if __name__ == "__main__":